@@ -0,0 +1,19 @@
+"""
+SkyGate Application - Celery Worker Entry Point
+This script creates the Flask application and exposes the Celery app for workers.
+
+Usage:
+    celery -A celery_worker.celery_app worker -Q detection
+    celery -A celery_worker.celery_app worker -Q default
+    celery -A celery_worker.celery_app beat
+"""
+
+from src.app import create_app
+from src.celery_app import celery_app
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Create Flask application so tasks run inside its context
+app = create_app()
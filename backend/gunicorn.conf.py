@@ -0,0 +1,48 @@
+"""
+SkyGate Application - Gunicorn Configuration
+This module configures the production WSGI server.
+
+Usage:
+    gunicorn -c gunicorn.conf.py run:app
+"""
+
+import multiprocessing
+import os
+
+# Bind address
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Worker processes and threads per worker; size DB_POOL_SIZE to at least `threads`
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Concurrent connections per worker when running async (gevent) workers
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+if worker_class == 'gevent':
+    # Patch before preload_app imports the application so that sockets, locks
+    # and psycopg2 all yield to the gevent hub instead of blocking the worker
+    from gevent import monkey
+    monkey.patch_all()
+    
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+# Import the application once in the master and fork workers from it
+preload_app = True
+
+# Uploads are streamed to disk, so allow slow clients more time
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+
+# Logging
+accesslog = '-'
+errorlog = '-'
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process"""
+    from src.models.postgresql_models import db
+    
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
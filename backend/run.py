@@ -1,11 +1,16 @@
 """
 SkyGate Application - Main Entry Point
-This script initializes and runs the Flask application.
+This script initializes the Flask application.
+
+In production the application is served by gunicorn:
+    gunicorn -c gunicorn.conf.py run:app
+
+Running this script directly starts the Werkzeug development server and is
+only allowed with FLASK_DEBUG=true.
 """
 
 import os
 from src.app import create_app
-from src.models.postgresql_models import db
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,15 +19,17 @@ load_dotenv()
 # Create Flask application
 app = create_app()
 
-# Initialize database
-with app.app_context():
-    db.init_app(app)
-    # Uncomment to create tables on startup (development only)
-    # db.create_all()
+# Uncomment to create tables on startup (development only)
+# from src.models.postgresql_models import db
+# with app.app_context():
+#     db.create_all()
 
 if __name__ == '__main__':
+    if os.environ.get('FLASK_DEBUG', 'False').lower() != 'true':
+        raise SystemExit('The development server requires FLASK_DEBUG=true; use "gunicorn -c gunicorn.conf.py run:app" instead.')
+    
     # Get port from environment or use default
     port = int(os.environ.get('PORT', 5000))
     
     # Run application
-    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG', 'False').lower() == 'true')
+    app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,17 @@
+"""
+SkyGate Application - API Package
+This package provides the SkyGate API blueprints and the function that registers them.
+"""
+
+from .endpoints import auth_bp, upload_bp, detection_bp, user_bp
+from .rest import api_bp
+
+def register_blueprints(app):
+    """Register the API blueprints on the application"""
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(upload_bp)
+    app.register_blueprint(detection_bp)
+    app.register_blueprint(user_bp)
+    app.register_blueprint(api_bp)
+
+__all__ = ['auth_bp', 'upload_bp', 'detection_bp', 'user_bp', 'api_bp', 'register_blueprints']
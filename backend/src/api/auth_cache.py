@@ -0,0 +1,150 @@
+"""
+SkyGate Application - Authentication Cache
+This module caches verified JWT identities so repeated requests skip token verification.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+
+from cachetools import TTLCache
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+
+from ..cache import cache
+
+# Backend for verified tokens: 'redis' (shared through Flask-Caching) or 'memory' (per process)
+TOKEN_CACHE_TYPE = os.environ.get('TOKEN_CACHE_TYPE', 'redis').lower()
+
+# Upper bound for how long a verified token is cached (seconds); bounds how long
+# a revoked token can still be accepted by a process that missed the invalidation
+TOKEN_CACHE_MAX_TTL = int(os.environ.get('TOKEN_CACHE_MAX_TTL', 60))
+
+# Number of cached token hashes tracked per user for bulk invalidation
+USER_TOKEN_INDEX_SIZE = 50
+
+# In-process store used when TOKEN_CACHE_TYPE=memory; values are (expires_at, value).
+# Each entry's own expiry is the real bound; the TTL only evicts stale entries
+_memory_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_MAX_TTL)
+_memory_lock = threading.Lock()
+
+def _cache_get(key):
+    """Read a value from the configured token cache backend"""
+    if TOKEN_CACHE_TYPE != 'memory':
+        return cache.get(key)
+    
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+    
+    if entry and entry[0] > time.time():
+        return entry[1]
+    
+    return None
+
+def _cache_set(key, value, ttl):
+    """Write a value to the configured token cache backend"""
+    if TOKEN_CACHE_TYPE != 'memory':
+        cache.set(key, value, timeout=ttl)
+        return
+    
+    with _memory_lock:
+        _memory_cache[key] = (time.time() + ttl, value)
+
+def _cache_delete(*keys):
+    """Remove values from the configured token cache backend"""
+    if TOKEN_CACHE_TYPE != 'memory':
+        cache.delete_many(*keys)
+        return
+    
+    with _memory_lock:
+        for key in keys:
+            _memory_cache.pop(key, None)
+
+def hash_token(token):
+    """Return the cache key hash for a raw JWT"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _get_bearer_token():
+    """Extract the raw bearer token from the Authorization header"""
+    auth_header = request.headers.get('Authorization', '')
+    parts = auth_header.split(None, 1)
+    
+    if len(parts) == 2 and parts[0].lower() == 'bearer':
+        return parts[1]
+    
+    return None
+
+def cached_jwt_required(refresh=False):
+    """
+    Drop-in replacement for jwt_required() backed by the token cache
+    
+    Args:
+        refresh: Require a refresh token instead of an access token
+    """
+    token_type = 'refresh' if refresh else 'access'
+    
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            token = _get_bearer_token()
+            token_hash = hash_token(token) if token else None
+            cached = _cache_get(f"jwt:{token_hash}") if token_hash else None
+            
+            if cached and cached['type'] == token_type:
+                g.jwt_identity = cached['identity']
+            else:
+                # Cache miss: run the normal verification and remember the result
+                verify_jwt_in_request(refresh=refresh)
+                g.jwt_identity = get_jwt_identity()
+                
+                if token_hash:
+                    expires_at = get_jwt().get('exp')
+                    ttl = TOKEN_CACHE_MAX_TTL
+                    if expires_at:
+                        ttl = min(int(expires_at - time.time()), TOKEN_CACHE_MAX_TTL)
+                    
+                    if ttl > 0:
+                        _cache_set(
+                            f"jwt:{token_hash}",
+                            {'identity': g.jwt_identity, 'type': token_type},
+                            ttl
+                        )
+                        _index_user_token(g.jwt_identity, token_hash)
+            
+            g.jwt_token_hash = token_hash
+            return fn(*args, **kwargs)
+        
+        return decorator
+    
+    return wrapper
+
+def _index_user_token(user_id, token_hash):
+    """Remember which cached tokens belong to a user so they can be invalidated together"""
+    key = f"jwt_user:{user_id}"
+    token_hashes = _cache_get(key) or []
+    
+    if token_hash not in token_hashes:
+        token_hashes.append(token_hash)
+        _cache_set(key, token_hashes[-USER_TOKEN_INDEX_SIZE:], TOKEN_CACHE_MAX_TTL)
+
+def get_current_user_id():
+    """Return the identity of the token verified for the current request"""
+    return g.get('jwt_identity')
+
+def get_current_token_hash():
+    """Return the cache key hash of the token used for the current request"""
+    return g.get('jwt_token_hash')
+
+def invalidate_token(token_hash):
+    """Remove a token from the cache so it is verified again on next use"""
+    if token_hash:
+        _cache_delete(f"jwt:{token_hash}")
+
+def invalidate_user_tokens(user_id):
+    """Remove every cached token issued to a user"""
+    key = f"jwt_user:{user_id}"
+    token_hashes = _cache_get(key) or []
+    
+    _cache_delete(key, *[f"jwt:{token_hash}" for token_hash in token_hashes])
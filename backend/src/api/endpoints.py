@@ -3,20 +3,36 @@ SkyGate Application - API Endpoints
 This module defines the API endpoints for the SkyGate application.
 """
 
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import create_access_token, create_refresh_token
 import os
+import secrets
 import uuid
+import magic
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from urllib.parse import unquote
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timezone
 import logging
+from ..utils.logging_utils import configure_logging
 
 from ..models.postgresql_models import db, User, Upload, DetectionResult
-from ..models.mongodb_models import MongoDBModel
-from ..detection.detection_engine import DetectionEngine
+from ..models.mongodb_models import MongoDBModel, DETECTION_DETAIL_PROJECTION
+from ..utils.security import hash_password, verify_password, needs_rehash
+from ..detection.tasks import process_detection_task
+from ..celery_app import celery_app
+from ..cache import cache
+from .auth_cache import (
+    cached_jwt_required, get_current_user_id,
+    get_current_token_hash, invalidate_token, invalidate_user_tokens
+)
+from .user_cache import get_user_cached, cache_user, invalidate_user
+from .login_tracker import record_login
+from .pagination import keyset_paginate, get_page_limit, invalidate_cached_total, InvalidCursorError
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Create blueprints
@@ -25,14 +41,37 @@ upload_bp = Blueprint('upload', __name__, url_prefix='/api/uploads')
 detection_bp = Blueprint('detection', __name__, url_prefix='/api/detections')
 user_bp = Blueprint('user', __name__, url_prefix='/api/users')
 
-# Initialize detection engine
-detection_engine = DetectionEngine()
+# Size of the chunks used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Number of leading bytes passed to libmagic for mime detection
+MIME_SNIFF_SIZE = 4096
 
 # Helper functions
-def allowed_file(filename):
+def allowed_file(filename, allowed_extensions=None):
     """Check if file has an allowed extension"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+    if allowed_extensions is None:
+        allowed_extensions = current_app.extensions['allowed_exts']
+    
+    ext = os.path.splitext(filename)[1][1:].lower()
+    return bool(ext) and ext in allowed_extensions
+
+def queue_detection(upload_id, user_id):
+    """
+    Queue detection for an upload and remember which user owns the task
+    
+    Args:
+        upload_id: ID of the upload to process
+        user_id: ID of the user who owns the upload
+        
+    Returns:
+        str: ID of the queued task
+    """
+    # Record the owner before queueing so the task is never visible without one
+    task_id = str(uuid.uuid4())
+    cache.set(f"task_owner:{task_id}", user_id, timeout=celery_app.conf.result_expires)
+    process_detection_task.apply_async(args=(upload_id,), task_id=task_id)
+    return task_id
 
 # Authentication endpoints
 @auth_bp.route('/register', methods=['POST'])
@@ -47,28 +86,22 @@ def register():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Check if user already exists
-        existing_user = User.query.filter(
-            (User.username == data['username']) | 
-            (User.email == data['email'])
-        ).first()
-        
-        if existing_user:
-            return jsonify({'error': 'Username or email already exists'}), 409
-        
         # Create new user
-        from werkzeug.security import generate_password_hash
-        
         new_user = User(
             username=data['username'],
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hash_password(data['password']),
             first_name=data.get('first_name'),
             last_name=data.get('last_name')
         )
         
+        # Rely on the unique constraints instead of a pre-check query
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Username or email already exists'}), 409
         
         return jsonify({
             'message': 'User registered successfully',
@@ -76,7 +109,7 @@ def register():
         }), 201
         
     except Exception as e:
-        logger.error(f"Error in user registration: {str(e)}")
+        logger.error("Error in user registration: %s", e)
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
 
@@ -94,15 +127,19 @@ def login():
         user = User.query.filter_by(username=data['username']).first()
         
         # Verify password
-        from werkzeug.security import check_password_hash
-        from flask_jwt_extended import create_access_token, create_refresh_token
-        
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not verify_password(user.password_hash, data['password']):
             return jsonify({'error': 'Invalid username or password'}), 401
         
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+        # Upgrade legacy or outdated hashes while the plain-text password is available
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(data['password'])
+            db.session.commit()
+        
+        # Record last login in Redis; a periodic task writes it to the database
+        last_login = record_login(user.user_id)
+        
+        # Warm the profile cache
+        cache_user(user, last_login=last_login)
         
         # Generate tokens
         access_token = create_access_token(identity=user.user_id)
@@ -116,66 +153,95 @@ def login():
         }), 200
         
     except Exception as e:
-        logger.error(f"Error in user login: {str(e)}")
+        logger.error("Error in user login: %s", e)
         return jsonify({'error': 'Login failed'}), 500
 
 @auth_bp.route('/refresh', methods=['POST'])
-@jwt_required(refresh=True)
+@cached_jwt_required(refresh=True)
 def refresh():
     """Refresh access token"""
     try:
-        from flask_jwt_extended import create_access_token
-        
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         access_token = create_access_token(identity=current_user_id)
         
         return jsonify({'access_token': access_token}), 200
         
     except Exception as e:
-        logger.error(f"Error in token refresh: {str(e)}")
+        logger.error("Error in token refresh: %s", e)
         return jsonify({'error': 'Token refresh failed'}), 500
 
 # Upload endpoints
 @upload_bp.route('', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def upload_file():
-    """Upload a file for AI detection"""
+    """Upload a file for AI detection
+    
+    The preferred contract is a raw request body with the original name in the
+    X-Filename header (URL-encoded) and the type in X-Content-Type, which is
+    streamed straight to disk. Multipart uploads with a 'file' part are still accepted.
+    """
     try:
-        # Check if file is in request
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file part in the request'}), 400
-        
-        file = request.files['file']
+        # Resolve the application once instead of going through the proxy per lookup
+        app = current_app._get_current_object()
+        
+        # Reject oversized bodies before reading them
+        max_length = app.config['MAX_CONTENT_LENGTH']
+        if request.content_length and request.content_length > max_length:
+            return jsonify({'error': 'File too large'}), 413
+        
+        if 'X-Filename' in request.headers:
+            filename = unquote(request.headers['X-Filename'])
+            content_type = request.headers.get('X-Content-Type')
+            stream = request.stream
+        else:
+            # Check if file is in request
+            if 'file' not in request.files:
+                return jsonify({'error': 'No file part in the request'}), 400
+            
+            file = request.files['file']
+            filename = file.filename
+            content_type = file.content_type
+            stream = file.stream
         
         # Check if file is selected
-        if file.filename == '':
+        if filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
         # Check if file type is allowed
-        if not allowed_file(file.filename):
+        if not allowed_file(filename, app.extensions['allowed_exts']):
             return jsonify({'error': 'File type not allowed'}), 400
         
         # Get current user
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Generate unique filename
-        original_filename = secure_filename(file.filename)
-        file_extension = original_filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
+        original_filename = secure_filename(filename)
+        file_extension = os.path.splitext(filename)[1][1:].lower()
+        unique_filename = f"{secrets.token_hex(16)}.{file_extension}"
         
         # Create upload directory if it doesn't exist
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        user_folder = os.path.join(upload_folder, str(current_user_id))
+        user_folder = os.path.join(app.extensions['upload_root'], str(current_user_id))
         os.makedirs(user_folder, exist_ok=True)
         
-        # Save file
+        # Stream file to disk in fixed-size chunks, counting bytes as we go
         file_path = os.path.join(user_folder, unique_filename)
-        file.save(file_path)
-        
-        # Get file size and type
-        file_size = os.path.getsize(file_path)
+        file_size = 0
+        head = b''
+        try:
+            with open(file_path, 'wb') as f:
+                while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                    if not head:
+                        head = chunk[:MIME_SNIFF_SIZE]
+                    f.write(chunk)
+                    file_size += len(chunk)
+        except Exception:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        
+        # Get file type, sniffing the real mime type from the leading bytes
         file_type = file_extension
-        mime_type = file.content_type or f"image/{file_extension}"
+        mime_type = magic.from_buffer(head, mime=True) if head else content_type
         
         # Create upload record
         new_upload = Upload(
@@ -186,78 +252,109 @@ def upload_file():
             file_size=file_size,
             file_type=file_type,
             mime_type=mime_type,
-            upload_date=datetime.utcnow(),
+            upload_date=datetime.now(timezone.utc),
             is_processed=False
         )
         
         db.session.add(new_upload)
         db.session.commit()
         
-        # Start detection process
-        return process_detection(new_upload.upload_id)
+        # Keep the cached listing total in step with the new row
+        invalidate_cached_total(f"upload_total:{current_user_id}")
+        
+        # Queue detection process
+        task_id = queue_detection(new_upload.upload_id, current_user_id)
+        
+        return jsonify({
+            'message': 'File uploaded successfully, detection queued',
+            'upload_id': new_upload.upload_id,
+            'task_id': task_id
+        }), 202
         
     except Exception as e:
-        logger.error(f"Error in file upload: {str(e)}")
+        logger.error("Error in file upload: %s", e)
         db.session.rollback()
         return jsonify({'error': 'File upload failed'}), 500
 
 @upload_bp.route('', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def get_uploads():
-    """Get all uploads for the current user"""
+    """Get uploads for the current user, newest first
+    
+    Uses keyset pagination: pass the previous response's next_cursor values
+    as ?before=<upload_date>&before_id=<upload_id> to fetch the next page.
+    """
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        # Query uploads, loading detection results in the same query
+        query = Upload.query.options(joinedload(Upload.detection_result)) \
+            .filter(Upload.user_id == current_user_id)
         
-        # Query uploads
-        uploads = Upload.query.filter_by(user_id=current_user_id) \
-            .order_by(Upload.upload_date.desc()) \
-            .paginate(page=page, per_page=per_page)
-        
-        # Format response
-        result = {
-            'items': [],
-            'total': uploads.total,
-            'pages': uploads.pages,
-            'current_page': uploads.page
-        }
+        try:
+            uploads, has_more, next_cursor = keyset_paginate(
+                query, Upload.upload_date, Upload.upload_id, get_page_limit()
+            )
+        except InvalidCursorError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Optionally enrich results with MongoDB metadata fetched in one round-trip
+        metadata_by_id = {}
+        if request.args.get('include_metadata', 'false').lower() == 'true':
+            metadata_by_id = MongoDBModel.get_detection_metadata_bulk(
+                [upload.detection_result.metadata_id for upload in uploads
+                 if upload.detection_result and upload.detection_result.metadata_id],
+                projection={'aggregated_results.contributing_factors': 1}
+            )
         
-        for upload in uploads.items:
-            # Get detection result if available
-            detection_result = None
-            if upload.detection_result:
-                detection_result = {
-                    'result_id': upload.detection_result.result_id,
-                    'is_ai_generated': upload.detection_result.is_ai_generated,
-                    'confidence_score': float(upload.detection_result.confidence_score),
-                    'detection_date': upload.detection_result.detection_date.isoformat()
-                }
+        # Stream the response so large pages are never built in memory
+        def generate():
+            dumps = current_app.json.dumps
+            
+            yield '{"items":['
+            
+            for index, upload in enumerate(uploads):
+                # Get detection result if available
+                detection_result = None
+                if upload.detection_result:
+                    detection_result = {
+                        'result_id': upload.detection_result.result_id,
+                        'is_ai_generated': upload.detection_result.is_ai_generated,
+                        'confidence_score': upload.detection_result.confidence_score,
+                        'detection_date': upload.detection_result.detection_date
+                    }
+                    
+                    metadata = metadata_by_id.get(upload.detection_result.metadata_id)
+                    if metadata:
+                        detection_result['contributing_factors'] = metadata.get('aggregated_results', {}).get('contributing_factors', [])
+                
+                item = dumps({
+                    'upload_id': upload.upload_id,
+                    'file_name': upload.original_file_name,
+                    'file_type': upload.file_type,
+                    'file_size': upload.file_size,
+                    'upload_date': upload.upload_date,
+                    'is_processed': upload.is_processed,
+                    'detection_result': detection_result
+                })
+                yield item if index == 0 else ',' + item
             
-            result['items'].append({
-                'upload_id': upload.upload_id,
-                'file_name': upload.original_file_name,
-                'file_type': upload.file_type,
-                'file_size': upload.file_size,
-                'upload_date': upload.upload_date.isoformat(),
-                'is_processed': upload.is_processed,
-                'detection_result': detection_result
-            })
+            yield '],"has_more":{},"next_cursor":{}}}'.format(
+                dumps(has_more), dumps(next_cursor)
+            )
         
-        return jsonify(result), 200
+        return Response(stream_with_context(generate()), status=200, mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error in get uploads: {str(e)}")
+        logger.error("Error in get uploads: %s", e)
         return jsonify({'error': 'Failed to retrieve uploads'}), 500
 
 @upload_bp.route('/<int:upload_id>', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def get_upload(upload_id):
     """Get a specific upload"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Query upload
         upload = Upload.query.filter_by(upload_id=upload_id, user_id=current_user_id).first()
@@ -271,9 +368,9 @@ def get_upload(upload_id):
             detection_result = {
                 'result_id': upload.detection_result.result_id,
                 'is_ai_generated': upload.detection_result.is_ai_generated,
-                'confidence_score': float(upload.detection_result.confidence_score),
-                'detection_date': upload.detection_result.detection_date.isoformat(),
-                'processing_time': float(upload.detection_result.processing_time),
+                'confidence_score': upload.detection_result.confidence_score,
+                'detection_date': upload.detection_result.detection_date,
+                'processing_time': upload.detection_result.processing_time,
                 'algorithm_version': upload.detection_result.algorithm_version,
                 'result_summary': upload.detection_result.result_summary
             }
@@ -283,7 +380,7 @@ def get_upload(upload_id):
             'file_name': upload.original_file_name,
             'file_type': upload.file_type,
             'file_size': upload.file_size,
-            'upload_date': upload.upload_date.isoformat(),
+            'upload_date': upload.upload_date,
             'is_processed': upload.is_processed,
             'detection_result': detection_result
         }
@@ -291,16 +388,16 @@ def get_upload(upload_id):
         return jsonify(result), 200
         
     except Exception as e:
-        logger.error(f"Error in get upload: {str(e)}")
+        logger.error("Error in get upload: %s", e)
         return jsonify({'error': 'Failed to retrieve upload'}), 500
 
 # Detection endpoints
 @detection_bp.route('/process/<int:upload_id>', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def process_detection(upload_id):
     """Process detection for an upload"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Query upload
         upload = Upload.query.filter_by(upload_id=upload_id, user_id=current_user_id).first()
@@ -315,76 +412,54 @@ def process_detection(upload_id):
                 'result_id': upload.detection_result.result_id
             }), 200
         
-        # Update upload status
-        upload.is_processed = False
-        upload.processing_started_at = datetime.utcnow()
-        db.session.commit()
+        # Queue detection process
+        task_id = queue_detection(upload.upload_id, current_user_id)
         
-        try:
-            # Create MongoDB metadata document
-            metadata_id = MongoDBModel.create_detection_metadata(
-                result_id=None,  # Will be updated after detection result is created
-                upload_id=upload.upload_id,
-                user_id=current_user_id,
-                file_info={
-                    'file_name': upload.original_file_name,
-                    'file_type': upload.file_type,
-                    'file_size': upload.file_size
-                }
-            )
-            
-            # Run detection
-            detection_results = detection_engine.detect(upload.file_path, str(metadata_id))
-            
-            # Create detection result
-            new_result = DetectionResult(
-                upload_id=upload.upload_id,
-                is_ai_generated=detection_results['is_ai_generated'],
-                confidence_score=detection_results['confidence_score'],
-                processing_time=detection_results['processing_time'],
-                detection_date=datetime.utcnow(),
-                algorithm_version='1.0',
-                result_summary=generate_result_summary(detection_results),
-                metadata_id=str(metadata_id)
-            )
-            
-            db.session.add(new_result)
-            db.session.flush()  # Get the result_id without committing
-            
-            # Update MongoDB metadata with result_id
-            MongoDBModel.update_detection_metadata(
-                metadata_id=str(metadata_id),
-                update_data={'result_id': new_result.result_id}
-            )
-            
-            # Update upload status
-            upload.is_processed = True
-            upload.processing_completed_at = datetime.utcnow()
-            
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Detection processed successfully',
-                'result_id': new_result.result_id,
-                'is_ai_generated': new_result.is_ai_generated,
-                'confidence_score': float(new_result.confidence_score)
-            }), 200
-            
-        except Exception as e:
-            logger.error(f"Error in detection processing: {str(e)}")
-            db.session.rollback()
-            return jsonify({'error': 'Detection processing failed'}), 500
+        return jsonify({
+            'message': 'Detection queued',
+            'upload_id': upload.upload_id,
+            'task_id': task_id
+        }), 202
         
     except Exception as e:
-        logger.error(f"Error in process detection: {str(e)}")
+        logger.error("Error in process detection: %s", e)
         return jsonify({'error': 'Failed to process detection'}), 500
 
+@detection_bp.route('/status/<task_id>', methods=['GET'])
+@cached_jwt_required()
+def get_detection_status(task_id):
+    """Get the status of a queued detection task"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        # Only expose tasks queued for the current user, whatever their state
+        if cache.get(f"task_owner:{task_id}") != current_user_id:
+            return jsonify({'error': 'Task not found'}), 404
+        
+        task = celery_app.AsyncResult(task_id)
+        
+        response = {
+            'task_id': task_id,
+            'state': task.state
+        }
+        
+        if task.successful():
+            response['result'] = task.result
+        elif task.failed():
+            response['error'] = 'Detection processing failed'
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        logger.error("Error in get detection status: %s", e)
+        return jsonify({'error': 'Failed to retrieve detection status'}), 500
+
 @detection_bp.route('/<int:result_id>', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def get_detection_result(result_id):
     """Get a specific detection result"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Query detection result
         result = DetectionResult.query.join(Upload).filter(
@@ -398,16 +473,16 @@ def get_detection_result(result_id):
         # Get MongoDB metadata
         metadata = None
         if result.metadata_id:
-            metadata = MongoDBModel.get_detection_metadata(result.metadata_id)
+            metadata = MongoDBModel.get_detection_metadata(result.metadata_id, DETECTION_DETAIL_PROJECTION)
         
         # Format response
         response = {
             'result_id': result.result_id,
             'upload_id': result.upload_id,
             'is_ai_generated': result.is_ai_generated,
-            'confidence_score': float(result.confidence_score),
-            'processing_time': float(result.processing_time),
-            'detection_date': result.detection_date.isoformat(),
+            'confidence_score': result.confidence_score,
+            'processing_time': result.processing_time,
+            'detection_date': result.detection_date,
             'algorithm_version': result.algorithm_version,
             'result_summary': result.result_summary
         }
@@ -428,47 +503,35 @@ def get_detection_result(result_id):
         return jsonify(response), 200
         
     except Exception as e:
-        logger.error(f"Error in get detection result: {str(e)}")
+        logger.error("Error in get detection result: %s", e)
         return jsonify({'error': 'Failed to retrieve detection result'}), 500
 
 # User endpoints
 @user_bp.route('/profile', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def get_profile():
     """Get current user profile"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Query user
-        user = User.query.filter_by(user_id=current_user_id).first()
+        response = get_user_cached(current_user_id)
         
-        if not user:
+        if not response:
             return jsonify({'error': 'User not found'}), 404
         
-        # Format response
-        response = {
-            'user_id': user.user_id,
-            'username': user.username,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'created_at': user.created_at.isoformat(),
-            'last_login': user.last_login.isoformat() if user.last_login else None,
-            'profile_image_url': user.profile_image_url
-        }
-        
         return jsonify(response), 200
         
     except Exception as e:
-        logger.error(f"Error in get profile: {str(e)}")
+        logger.error("Error in get profile: %s", e)
         return jsonify({'error': 'Failed to retrieve profile'}), 500
 
 @user_bp.route('/profile', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required()
 def update_profile():
     """Update current user profile"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         data = request.get_json()
         
         # Query user
@@ -485,15 +548,6 @@ def update_profile():
             user.last_name = data['last_name']
         
         if 'email' in data:
-            # Check if email is already used
-            existing_user = User.query.filter(
-                User.email == data['email'],
-                User.user_id != current_user_id
-            ).first()
-            
-            if existing_user:
-                return jsonify({'error': 'Email already in use'}), 409
-            
             user.email = data['email']
         
         if 'profile_image_url' in data:
@@ -501,62 +555,29 @@ def update_profile():
         
         # Update password if provided
         if 'current_password' in data and 'new_password' in data:
-            from werkzeug.security import check_password_hash, generate_password_hash
-            
-            if not check_password_hash(user.password_hash, data['current_password']):
+            if not verify_password(user.password_hash, data['current_password']):
                 return jsonify({'error': 'Current password is incorrect'}), 401
             
-            user.password_hash = generate_password_hash(data['new_password'])
+            user.password_hash = hash_password(data['new_password'])
         
-        db.session.commit()
+        # The unique constraint on email rejects addresses used by other accounts
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Email already in use'}), 409
+        
+        # Drop cached profile and tokens that may reflect the old data
+        invalidate_user(current_user_id)
+        
+        if 'email' in data:
+            invalidate_user_tokens(current_user_id)
+        elif 'current_password' in data and 'new_password' in data:
+            invalidate_token(get_current_token_hash())
         
         return jsonify({'message': 'Profile updated successfully'}), 200
         
     except Exception as e:
-        logger.error(f"Error in update profile: {str(e)}")
+        logger.error("Error in update profile: %s", e)
         db.session.rollback()
         return jsonify({'error': 'Failed to update profile'}), 500
-
-# Helper functions
-def generate_result_summary(detection_results):
-    """Generate a human-readable summary of detection results"""
-    try:
-        is_ai_generated = detection_results['is_ai_generated']
-        confidence = detection_results['confidence_score']
-        contributing_factors = detection_results.get('contributing_factors', [])
-        
-        if is_ai_generated:
-            summary = f"This image is likely AI-generated with {confidence:.1%} confidence. "
-            
-            if contributing_factors:
-                summary += "Key indicators include: "
-                factor_descriptions = []
-                
-                for factor in contributing_factors:
-                    factor_name = factor['factor']
-                    contribution = factor['contribution']
-                    
-                    if factor_name == 'metadata_analysis':
-                        factor_descriptions.append(f"suspicious metadata patterns ({contribution:.1%} confidence)")
-                    elif factor_name == 'ela_analysis':
-                        factor_descriptions.append(f"error level analysis ({contribution:.1%} confidence)")
-                    elif factor_name == 'prnu_analysis':
-                        factor_descriptions.append(f"photo response non-uniformity ({contribution:.1%} confidence)")
-                    elif factor_name == 'texture_analysis':
-                        factor_descriptions.append(f"unnatural texture smoothness ({contribution:.1%} confidence)")
-                    elif factor_name == 'vit_model':
-                        factor_descriptions.append(f"Vision Transformer model detection ({contribution:.1%} confidence)")
-                    elif factor_name == 'resnet_model':
-                        factor_descriptions.append(f"ResNet model detection ({contribution:.1%} confidence)")
-                
-                summary += ", ".join(factor_descriptions) + "."
-            
-        else:
-            summary = f"This image appears to be authentic with {(1-confidence):.1%} confidence. "
-            summary += "No significant indicators of AI generation were detected."
-        
-        return summary
-        
-    except Exception as e:
-        logger.error(f"Error in generate result summary: {str(e)}")
-        return "Detection completed, but summary generation failed."
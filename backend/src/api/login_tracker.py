@@ -0,0 +1,105 @@
+"""
+SkyGate Application - Login Tracker
+This module records login times in Redis and writes them to PostgreSQL in batches.
+"""
+
+import time
+from datetime import datetime, timezone
+
+import redis
+from flask import current_app
+from sqlalchemy import Integer, DateTime, column, update, values
+
+from ..celery_app import celery_app
+from ..models.postgresql_models import db, User
+from .user_cache import invalidate_users
+
+# Sorted set of user_id -> last login timestamp awaiting a flush
+LOGIN_TIMESTAMPS_KEY = 'login_ts'
+
+# Pending set being written by a flush; kept until the UPDATE commits
+LOGIN_TIMESTAMPS_PROCESSING_KEY = 'login_ts:processing'
+
+# Redis client, created on first use in each process
+_redis_client = None
+
+def get_redis_client():
+    """Return the Redis client used for login tracking"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(current_app.config['CACHE_REDIS_URL'])
+    return _redis_client
+
+def record_login(user_id):
+    """
+    Record a login without writing to PostgreSQL
+    
+    Args:
+        user_id: ID of the user who logged in
+        
+    Returns:
+        datetime: The recorded login time (UTC)
+    """
+    now = time.time()
+    get_redis_client().zadd(LOGIN_TIMESTAMPS_KEY, {user_id: now})
+    return datetime.fromtimestamp(now, timezone.utc)
+
+@celery_app.task(name='skygate.flush_login_timestamps', ignore_result=True)
+def flush_login_timestamps():
+    """
+    Write pending login times to users.last_login in a single UPDATE
+    
+    Returns:
+        int: Number of users updated
+    """
+    client = get_redis_client()
+    
+    # Move the pending set aside atomically so logins recorded meanwhile are kept for
+    # the next flush; a set left over from a failed flush is retried first
+    if not client.exists(LOGIN_TIMESTAMPS_PROCESSING_KEY):
+        try:
+            client.rename(LOGIN_TIMESTAMPS_KEY, LOGIN_TIMESTAMPS_PROCESSING_KEY)
+        except redis.ResponseError:
+            # Nothing recorded since the last flush
+            return 0
+    
+    pending = client.zrange(LOGIN_TIMESTAMPS_PROCESSING_KEY, 0, -1, withscores=True)
+    
+    if not pending:
+        client.delete(LOGIN_TIMESTAMPS_PROCESSING_KEY)
+        return 0
+    
+    logins = values(
+        column('user_id', Integer),
+        column('login_at', DateTime(timezone=True)),
+        name='logins'
+    ).data([(int(user_id), datetime.fromtimestamp(score, timezone.utc)) for user_id, score in pending])
+    
+    try:
+        # UPDATE users SET last_login = logins.login_at FROM (VALUES ...) AS logins WHERE ...
+        db.session.execute(
+            update(User)
+            .where(User.user_id == logins.c.user_id)
+            .values(last_login=logins.c.login_at)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        
+        # Put the batch back, keeping the newest login per user
+        pipe = client.pipeline(transaction=True)
+        pipe.zunionstore(
+            LOGIN_TIMESTAMPS_KEY,
+            [LOGIN_TIMESTAMPS_KEY, LOGIN_TIMESTAMPS_PROCESSING_KEY],
+            aggregate='MAX'
+        )
+        pipe.delete(LOGIN_TIMESTAMPS_PROCESSING_KEY)
+        pipe.execute()
+        raise
+    
+    client.delete(LOGIN_TIMESTAMPS_PROCESSING_KEY)
+    
+    # Cached profiles still carry the last_login from before this flush
+    invalidate_users(int(user_id) for user_id, _ in pending)
+    
+    return len(pending)
@@ -0,0 +1,110 @@
+"""
+SkyGate Application - Pagination Helpers
+This module provides keyset pagination shared by the API endpoints and resources.
+"""
+
+from datetime import datetime, timezone
+
+from flask import request
+from sqlalchemy import tuple_
+
+from ..cache import cache
+
+# Default and largest page size accepted by list endpoints
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# How long per-user list totals are cached (seconds)
+LIST_TOTAL_CACHE_TTL = 60
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be parsed"""
+
+def parse_cursor_date(value):
+    """Parse an ISO-8601 pagination cursor into an aware UTC datetime, or None if invalid"""
+    try:
+        cursor_date = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    
+    # Cursors issued before timestamps carried a zone are naive UTC
+    if cursor_date.tzinfo is None:
+        return cursor_date.replace(tzinfo=timezone.utc)
+    
+    return cursor_date.astimezone(timezone.utc)
+
+def get_page_limit():
+    """Read the requested page size from ?limit= (or legacy ?per_page=), clamped to MAX_PAGE_SIZE"""
+    limit = request.args.get('limit', type=int)
+    if limit is None:
+        limit = request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+    
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+def keyset_paginate(query, date_column, id_column, limit):
+    """
+    Fetch one page of a query ordered by (date_column, id_column) descending
+    
+    The cursor is read from ?before=<iso date>&before_id=<id>; each page is a
+    single index range scan with no COUNT(*).
+    
+    Args:
+        query: Filtered SQLAlchemy query
+        date_column: Timestamp column used as the primary sort key
+        id_column: Unique column used to break ties
+        limit: Maximum number of rows to return
+        
+    Returns:
+        tuple: (rows, has_more, next_cursor)
+        
+    Raises:
+        InvalidCursorError: If the cursor parameters are malformed
+    """
+    before = request.args.get('before')
+    
+    if before:
+        before_date = parse_cursor_date(before)
+        before_id = request.args.get('before_id', type=int)
+        if before_date is None or before_id is None:
+            raise InvalidCursorError('Invalid pagination cursor')
+        
+        query = query.filter(tuple_(date_column, id_column) < tuple_(before_date, before_id))
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(date_column.desc(), id_column.desc()).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last_row = rows[-1]
+        next_cursor = {
+            'before': getattr(last_row, date_column.key).isoformat(),
+            'before_id': getattr(last_row, id_column.key)
+        }
+    
+    return rows, has_more, next_cursor
+
+def get_cached_total(cache_key, query):
+    """
+    Count the rows of a query, caching the result briefly
+    
+    Args:
+        cache_key: Cache key unique to the user and listing
+        query: Filtered SQLAlchemy query to count
+        
+    Returns:
+        int: Number of matching rows (may be up to LIST_TOTAL_CACHE_TTL seconds stale)
+    """
+    total = cache.get(cache_key)
+    
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(cache_key, total, timeout=LIST_TOTAL_CACHE_TTL)
+    
+    return total
+
+def invalidate_cached_total(cache_key):
+    """Drop a cached total after rows are added or removed"""
+    cache.delete(cache_key)
@@ -4,447 +4,635 @@ This module defines the RESTful API resources for the SkyGate application.
 """
 
 from flask_restful import Resource, reqparse
-from flask import request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, current_app, jsonify, Response, stream_with_context
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import func, update, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+import hashlib
+import queue
+import threading
+from sqlalchemy.orm import joinedload, contains_eager, raiseload, aliased
 import logging
+from ..utils.logging_utils import configure_logging
 
 from ..models.postgresql_models import db, User, Upload, DetectionResult
-from ..models.mongodb_models import MongoDBModel
+from ..models.mongodb_models import MongoDBModel, DETECTION_DETAIL_PROJECTION
+from ..utils.serialization import dumps_bytes
+from ..utils.security import hash_password, verify_password, needs_rehash
+from ..detection.tasks import delete_file_task
+from .auth_cache import cached_jwt_required, get_current_user_id, invalidate_user_tokens
+from .user_cache import get_user_cached, cache_user, invalidate_user
+from .login_tracker import record_login
+from .pagination import (
+    keyset_paginate, get_page_limit, get_cached_total, invalidate_cached_total, InvalidCursorError
+)
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Profile fields a user may change through UserResource.put
+USER_UPDATE_FIELDS = ('first_name', 'last_name', 'email', 'profile_image_url')
+
+# Request parsers are built once at import time and shared across requests
+_LOGIN_PARSER = reqparse.RequestParser()
+_LOGIN_PARSER.add_argument('username', type=str, required=True, location='json',
+                           help='Username and password are required')
+_LOGIN_PARSER.add_argument('password', type=str, required=True, location='json',
+                           help='Username and password are required')
+
+_USER_CREATE_PARSER = reqparse.RequestParser()
+for field in ('username', 'email', 'password'):
+    _USER_CREATE_PARSER.add_argument(field, type=str, required=True, location='json',
+                                     help=f'Missing required field: {field}')
+for field in ('first_name', 'last_name'):
+    _USER_CREATE_PARSER.add_argument(field, type=str, location='json')
+
+# Absent fields are left out so that only submitted fields are updated
+_USER_UPDATE_PARSER = reqparse.RequestParser()
+for field in USER_UPDATE_FIELDS:
+    _USER_UPDATE_PARSER.add_argument(field, type=str, location='json', store_missing=False)
+
+# Columns selected for upload listings and the keys they are returned under
+UPLOAD_LIST_COLUMNS = (
+    Upload.upload_id,
+    Upload.original_file_name,
+    Upload.file_type,
+    Upload.file_size,
+    Upload.upload_date,
+    Upload.is_processed
+)
+UPLOAD_LIST_KEYS = ('upload_id', 'file_name', 'file_type', 'file_size', 'upload_date', 'is_processed')
+
+DETECTION_SUMMARY_COLUMNS = (
+    DetectionResult.result_id,
+    DetectionResult.is_ai_generated,
+    DetectionResult.confidence_score,
+    DetectionResult.detection_date
+)
+DETECTION_SUMMARY_KEYS = ('result_id', 'is_ai_generated', 'confidence_score', 'detection_date')
+
+# Rows fetched per round-trip when streaming exports through a server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# CSV exports are produced by PostgreSQL itself and streamed straight to the client
+UPLOAD_EXPORT_CSV_SQL = """
+    COPY (
+        SELECT u.upload_id, u.original_file_name AS file_name, u.file_type, u.file_size,
+               u.upload_date, u.is_processed, d.result_id, d.is_ai_generated,
+               d.confidence_score, d.detection_date
+        FROM uploads u
+        LEFT JOIN detection_results d ON d.upload_id = u.upload_id
+        WHERE u.user_id = %s
+        ORDER BY u.upload_date DESC, u.upload_id DESC
+    ) TO STDOUT WITH (FORMAT CSV, HEADER)
+"""
+
+# Helper functions
+def make_etag(*parts):
+    """Build an ETag from the values that identify a representation's version"""
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds this version, otherwise None"""
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    return None
+
+def etag_response(payload, etag):
+    """Serialize a payload into a response tagged with an ETag"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
 class UserResource(Resource):
     """Resource for individual user operations"""
     
-    @jwt_required()
+    @cached_jwt_required()
     def get(self, user_id):
         """Get user details"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            # Only allow users to access their own data
-            if current_user_id != user_id:
-                return {'error': 'Unauthorized access'}, 403
-            
-            user = User.query.filter_by(user_id=user_id).first()
-            
-            if not user:
-                return {'error': 'User not found'}, 404
-            
-            return {
-                'user_id': user.user_id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'created_at': user.created_at.isoformat(),
-                'last_login': user.last_login.isoformat() if user.last_login else None,
-                'profile_image_url': user.profile_image_url
-            }, 200
-            
-        except Exception as e:
-            logger.error(f"Error in get user: {str(e)}")
-            return {'error': 'Failed to retrieve user'}, 500
+        current_user_id = get_current_user_id()
+        
+        # Only allow users to access their own data
+        if current_user_id != user_id:
+            return {'error': 'Unauthorized access'}, 403
+        
+        # Read the profile through the shared user cache
+        profile = get_user_cached(user_id)
+        
+        if not profile:
+            return {'error': 'User not found'}, 404
+        
+        # Let clients revalidate their copy with If-None-Match
+        etag = make_etag(profile['user_id'], profile.get('updated_at') or profile['created_at'])
+        return not_modified(etag) or etag_response(profile, etag)
     
-    @jwt_required()
+    @cached_jwt_required()
     def put(self, user_id):
         """Update user details"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            # Only allow users to update their own data
-            if current_user_id != user_id:
-                return {'error': 'Unauthorized access'}, 403
-            
-            user = User.query.filter_by(user_id=user_id).first()
-            
-            if not user:
-                return {'error': 'User not found'}, 404
-            
-            data = request.get_json()
-            
-            # Update fields
-            if 'first_name' in data:
-                user.first_name = data['first_name']
-            
-            if 'last_name' in data:
-                user.last_name = data['last_name']
-            
-            if 'email' in data:
-                # Check if email is already used
-                existing_user = User.query.filter(
-                    User.email == data['email'],
-                    User.user_id != user_id
-                ).first()
-                
-                if existing_user:
-                    return {'error': 'Email already in use'}, 409
-                
-                user.email = data['email']
-            
-            if 'profile_image_url' in data:
-                user.profile_image_url = data['profile_image_url']
-            
-            db.session.commit()
-            
+        # Collect the fields present in the request; reqparse answers malformed input with a 400
+        updates = dict(_USER_UPDATE_PARSER.parse_args())
+        
+        current_user_id = get_current_user_id()
+        
+        # Only allow users to update their own data
+        if current_user_id != user_id:
+            return {'error': 'Unauthorized access'}, 403
+        
+        # Nothing to write, so skip the round-trip and the commit
+        if not updates:
             return {'message': 'User updated successfully'}, 200
-            
-        except Exception as e:
-            logger.error(f"Error in update user: {str(e)}")
+        
+        # Update in a single statement; the email guard replaces a separate uniqueness query
+        stmt = update(User).where(User.user_id == user_id).values(**updates)
+        
+        if 'email' in updates:
+            # Alias the table so the subquery is not correlated to the row being updated
+            other_user = aliased(User)
+            stmt = stmt.where(
+                ~exists().where(other_user.email == updates['email'], other_user.user_id != user_id)
+            )
+        
+        try:
+            result = db.session.execute(stmt)
+        except IntegrityError:
+            # A concurrent update claimed the email between the guard and the write
             db.session.rollback()
-            return {'error': 'Failed to update user'}, 500
+            return {'error': 'Email already in use'}, 409
+        
+        if result.rowcount == 0:
+            db.session.rollback()
+            
+            # Only the failure path pays for telling a taken email from a missing user
+            if 'email' in updates and db.session.query(exists().where(User.user_id == user_id)).scalar():
+                return {'error': 'Email already in use'}, 409
+            
+            return {'error': 'User not found'}, 404
+        
+        db.session.commit()
+        
+        # Drop the cached profile and tokens verified against the old email
+        invalidate_user(user_id)
+        
+        if 'email' in updates:
+            invalidate_user_tokens(user_id)
+        
+        return {'message': 'User updated successfully'}, 200
     
-    @jwt_required()
+    @cached_jwt_required()
     def delete(self, user_id):
         """Delete user"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            # Only allow users to delete their own account
-            if current_user_id != user_id:
-                return {'error': 'Unauthorized access'}, 403
-            
-            user = User.query.filter_by(user_id=user_id).first()
-            
-            if not user:
-                return {'error': 'User not found'}, 404
-            
-            db.session.delete(user)
-            db.session.commit()
-            
-            return {'message': 'User deleted successfully'}, 200
-            
-        except Exception as e:
-            logger.error(f"Error in delete user: {str(e)}")
-            db.session.rollback()
-            return {'error': 'Failed to delete user'}, 500
+        current_user_id = get_current_user_id()
+        
+        # Only allow users to delete their own account
+        if current_user_id != user_id:
+            return {'error': 'Unauthorized access'}, 403
+        
+        user = User.query.filter_by(user_id=user_id).first()
+        
+        if not user:
+            return {'error': 'User not found'}, 404
+        
+        db.session.delete(user)
+        db.session.commit()
+        
+        # Stop serving the cached profile and tokens of the deleted account
+        invalidate_user(user_id)
+        invalidate_user_tokens(user_id)
+        
+        return {'message': 'User deleted successfully'}, 200
 
 class UserListResource(Resource):
     """Resource for user collection operations"""
     
     def post(self):
         """Create a new user"""
-        try:
-            data = request.get_json()
-            
-            # Validate required fields
-            required_fields = ['username', 'email', 'password']
-            for field in required_fields:
-                if field not in data:
-                    return {'error': f'Missing required field: {field}'}, 400
-            
-            # Check if user already exists
-            existing_user = User.query.filter(
-                (User.username == data['username']) | 
-                (User.email == data['email'])
-            ).first()
-            
-            if existing_user:
-                return {'error': 'Username or email already exists'}, 409
-            
-            # Create new user
-            from werkzeug.security import generate_password_hash
-            
-            new_user = User(
-                username=data['username'],
-                email=data['email'],
-                password_hash=generate_password_hash(data['password']),
-                first_name=data.get('first_name'),
-                last_name=data.get('last_name')
-            )
-            
-            db.session.add(new_user)
-            db.session.commit()
-            
-            return {
-                'message': 'User created successfully',
-                'user_id': new_user.user_id
-            }, 201
-            
-        except Exception as e:
-            logger.error(f"Error in create user: {str(e)}")
+        # Validate required fields; reqparse answers missing ones with a 400
+        data = _USER_CREATE_PARSER.parse_args()
+        
+        # Create new user in one statement; the unique constraints on
+        # username and email reject duplicates without a pre-check query
+        stmt = insert(User).values(
+            username=data['username'],
+            email=data['email'],
+            password_hash=hash_password(data['password']),
+            first_name=data.get('first_name'),
+            last_name=data.get('last_name')
+        ).on_conflict_do_nothing().returning(User.user_id)
+        
+        user_id = db.session.execute(stmt).scalar()
+        
+        if user_id is None:
             db.session.rollback()
-            return {'error': 'Failed to create user'}, 500
+            return {'error': 'Username or email already exists'}, 409
+        
+        db.session.commit()
+        
+        return {
+            'message': 'User created successfully',
+            'user_id': user_id
+        }, 201
 
 class UploadResource(Resource):
     """Resource for individual upload operations"""
     
-    @jwt_required()
+    @cached_jwt_required()
     def get(self, upload_id):
         """Get upload details"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            upload = Upload.query.filter_by(upload_id=upload_id, user_id=current_user_id).first()
-            
-            if not upload:
-                return {'error': 'Upload not found'}, 404
-            
-            # Get detection result if available
-            detection_result = None
-            if upload.detection_result:
-                detection_result = {
-                    'result_id': upload.detection_result.result_id,
-                    'is_ai_generated': upload.detection_result.is_ai_generated,
-                    'confidence_score': float(upload.detection_result.confidence_score),
-                    'detection_date': upload.detection_result.detection_date.isoformat(),
-                    'processing_time': float(upload.detection_result.processing_time),
-                    'algorithm_version': upload.detection_result.algorithm_version,
-                    'result_summary': upload.detection_result.result_summary
-                }
-            
-            result = {
-                'upload_id': upload.upload_id,
-                'file_name': upload.original_file_name,
-                'file_type': upload.file_type,
-                'file_size': upload.file_size,
-                'upload_date': upload.upload_date.isoformat(),
-                'is_processed': upload.is_processed,
-                'detection_result': detection_result
+        current_user_id = get_current_user_id()
+        
+        upload = Upload.query.options(joinedload(Upload.detection_result), raiseload('*')) \
+            .filter_by(upload_id=upload_id, user_id=current_user_id) \
+            .first()
+        
+        if not upload:
+            return {'error': 'Upload not found'}, 404
+        
+        # Skip serialization when the client's copy is current
+        etag = make_etag(upload.upload_id, upload.updated_at or upload.upload_date)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        # Get detection result if available
+        detection_result = None
+        if upload.detection_result:
+            detection_result = {
+                'result_id': upload.detection_result.result_id,
+                'is_ai_generated': upload.detection_result.is_ai_generated,
+                'confidence_score': upload.detection_result.confidence_score,
+                'detection_date': upload.detection_result.detection_date,
+                'processing_time': upload.detection_result.processing_time,
+                'algorithm_version': upload.detection_result.algorithm_version,
+                'result_summary': upload.detection_result.result_summary
             }
-            
-            return result, 200
-            
-        except Exception as e:
-            logger.error(f"Error in get upload: {str(e)}")
-            return {'error': 'Failed to retrieve upload'}, 500
+        
+        result = {
+            'upload_id': upload.upload_id,
+            'file_name': upload.original_file_name,
+            'file_type': upload.file_type,
+            'file_size': upload.file_size,
+            'upload_date': upload.upload_date,
+            'is_processed': upload.is_processed,
+            'detection_result': detection_result
+        }
+        
+        return etag_response(result, etag)
     
-    @jwt_required()
+    @cached_jwt_required()
     def delete(self, upload_id):
         """Delete upload"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            upload = Upload.query.filter_by(upload_id=upload_id, user_id=current_user_id).first()
-            
-            if not upload:
-                return {'error': 'Upload not found'}, 404
-            
-            # Delete file
-            import os
-            if os.path.exists(upload.file_path):
-                os.remove(upload.file_path)
-            
-            # Delete from database
-            db.session.delete(upload)
-            db.session.commit()
-            
-            return {'message': 'Upload deleted successfully'}, 200
-            
-        except Exception as e:
-            logger.error(f"Error in delete upload: {str(e)}")
-            db.session.rollback()
-            return {'error': 'Failed to delete upload'}, 500
+        current_user_id = get_current_user_id()
+        
+        upload = Upload.query.filter_by(upload_id=upload_id, user_id=current_user_id).first()
+        
+        if not upload:
+            return {'error': 'Upload not found'}, 404
+        
+        file_path = upload.file_path
+        
+        # Delete from database first so a failure never leaves a row without its file
+        db.session.delete(upload)
+        db.session.commit()
+        
+        # Remove the file in the background on the default queue
+        delete_file_task.delay(file_path)
+        
+        # The upload and its detection result no longer count towards the totals
+        invalidate_cached_total(f"upload_total:{current_user_id}")
+        invalidate_cached_total(f"detection_total:{current_user_id}")
+        
+        return {'message': 'Upload deleted successfully'}, 200
 
 class UploadListResource(Resource):
     """Resource for upload collection operations"""
     
-    @jwt_required()
+    @cached_jwt_required()
     def get(self):
         """Get all uploads for the current user"""
+        current_user_id = get_current_user_id()
+        
+        # Version the listing by its newest change and size before loading the page
+        total = get_cached_total(
+            f"upload_total:{current_user_id}",
+            Upload.query.filter_by(user_id=current_user_id)
+        )
+        last_updated = db.session.query(func.max(Upload.updated_at)) \
+            .filter(Upload.user_id == current_user_id) \
+            .scalar()
+        
+        etag = make_etag(current_user_id, last_updated, total, request.query_string.decode())
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        # Select only the listed columns; rows are plain tuples rather than ORM entities
+        query = db.session.query(*UPLOAD_LIST_COLUMNS, *DETECTION_SUMMARY_COLUMNS) \
+            .outerjoin(DetectionResult, DetectionResult.upload_id == Upload.upload_id) \
+            .filter(Upload.user_id == current_user_id)
+        
+        # Page by keyset instead of OFFSET + COUNT(*)
         try:
-            current_user_id = get_jwt_identity()
-            
-            # Get pagination parameters
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
-            
-            # Query uploads
-            uploads = Upload.query.filter_by(user_id=current_user_id) \
-                .order_by(Upload.upload_date.desc()) \
-                .paginate(page=page, per_page=per_page)
-            
-            # Format response
-            result = {
-                'items': [],
-                'total': uploads.total,
-                'pages': uploads.pages,
-                'current_page': uploads.page
-            }
-            
-            for upload in uploads.items:
-                # Get detection result if available
-                detection_result = None
-                if upload.detection_result:
-                    detection_result = {
-                        'result_id': upload.detection_result.result_id,
-                        'is_ai_generated': upload.detection_result.is_ai_generated,
-                        'confidence_score': float(upload.detection_result.confidence_score),
-                        'detection_date': upload.detection_result.detection_date.isoformat()
-                    }
-                
-                result['items'].append({
-                    'upload_id': upload.upload_id,
-                    'file_name': upload.original_file_name,
-                    'file_type': upload.file_type,
-                    'file_size': upload.file_size,
-                    'upload_date': upload.upload_date.isoformat(),
-                    'is_processed': upload.is_processed,
-                    'detection_result': detection_result
-                })
-            
-            return result, 200
-            
+            uploads, has_more, next_cursor = keyset_paginate(
+                query, Upload.upload_date, Upload.upload_id, get_page_limit()
+            )
+        except InvalidCursorError as e:
+            return {'error': str(e)}, 400
+        
+        # Format response by zipping each row with the precomputed keys; dates and
+        # decimals are encoded by the JSON provider
+        upload_count = len(UPLOAD_LIST_KEYS)
+        result = {
+            'items': [
+                {
+                    **dict(zip(UPLOAD_LIST_KEYS, row[:upload_count])),
+                    'detection_result': (
+                        dict(zip(DETECTION_SUMMARY_KEYS, row[upload_count:]))
+                        if row.result_id is not None else None
+                    )
+                }
+                for row in uploads
+            ],
+            'total': total,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }
+        
+        return etag_response(result, etag)
+
+class _CopyStream:
+    """File-like sink that hands COPY output to the response generator through a bounded queue"""
+    
+    def __init__(self, maxsize=64):
+        self.chunks = queue.Queue(maxsize=maxsize)
+        self.cancelled = threading.Event()
+    
+    def write(self, data):
+        # Keep retrying so a slow client applies backpressure, but give up once it disconnects
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(data, timeout=1)
+                return len(data)
+            except queue.Full:
+                continue
+        raise IOError("Export stream cancelled")
+
+def stream_copy(engine, sql, params):
+    """Run COPY ... TO STDOUT in a background thread and yield its output as it arrives"""
+    sink = _CopyStream()
+    done = object()
+    
+    # Check out a pooled DBAPI connection only once the response starts streaming
+    raw_connection = engine.raw_connection()
+    
+    def run_copy():
+        try:
+            with raw_connection.cursor() as cursor:
+                cursor.copy_expert(cursor.mogrify(sql, params).decode(), sink)
+            raw_connection.commit()
         except Exception as e:
-            logger.error(f"Error in get uploads: {str(e)}")
-            return {'error': 'Failed to retrieve uploads'}, 500
+            logger.error("Error in export copy: %s", e)
+            raw_connection.rollback()
+        finally:
+            raw_connection.close()
+            if not sink.cancelled.is_set():
+                sink.chunks.put(done)
+    
+    threading.Thread(target=run_copy, name='export-copy', daemon=True).start()
+    
+    try:
+        while True:
+            chunk = sink.chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        sink.cancelled.set()
+
+class UploadExportResource(Resource):
+    """Resource for exporting all of a user's uploads"""
+    
+    @cached_jwt_required()
+    def get(self):
+        """Stream every upload for the current user as NDJSON, or as CSV with ?format=csv"""
+        current_user_id = get_current_user_id()
+        
+        if request.args.get('format', 'ndjson').lower() == 'csv':
+            # Let PostgreSQL render the CSV; the copy thread releases its connection when done
+            response = Response(
+                stream_copy(db.engine, UPLOAD_EXPORT_CSV_SQL, (current_user_id,)),
+                mimetype='text/csv'
+            )
+            response.headers['Content-Disposition'] = 'attachment; filename=uploads.csv'
+            return response
+        
+        query = db.select(*UPLOAD_LIST_COLUMNS, *DETECTION_SUMMARY_COLUMNS) \
+            .outerjoin(DetectionResult, DetectionResult.upload_id == Upload.upload_id) \
+            .where(Upload.user_id == current_user_id) \
+            .order_by(Upload.upload_date.desc(), Upload.upload_id.desc())
+        
+        keys = UPLOAD_LIST_KEYS + DETECTION_SUMMARY_KEYS
+        
+        def generate():
+            # A server-side cursor keeps only one batch of rows in memory at a time
+            with db.engine.connect().execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE) as connection:
+                for row in connection.execute(query):
+                    yield dumps_bytes(dict(zip(keys, row))) + b'\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 class DetectionResource(Resource):
     """Resource for individual detection result operations"""
     
-    @jwt_required()
+    @cached_jwt_required()
     def get(self, result_id):
         """Get detection result details"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            # Query detection result
-            result = DetectionResult.query.join(Upload).filter(
+        current_user_id = get_current_user_id()
+        
+        # Query detection result
+        result = DetectionResult.query.join(Upload) \
+            .options(contains_eager(DetectionResult.upload)) \
+            .filter(
                 DetectionResult.result_id == result_id,
                 Upload.user_id == current_user_id
             ).first()
-            
-            if not result:
-                return {'error': 'Detection result not found'}, 404
-            
-            # Get MongoDB metadata
-            metadata = None
-            if result.metadata_id:
-                metadata = MongoDBModel.get_detection_metadata(result.metadata_id)
-            
-            # Format response
-            response = {
-                'result_id': result.result_id,
-                'upload_id': result.upload_id,
-                'is_ai_generated': result.is_ai_generated,
-                'confidence_score': float(result.confidence_score),
-                'processing_time': float(result.processing_time),
-                'detection_date': result.detection_date.isoformat(),
-                'algorithm_version': result.algorithm_version,
-                'result_summary': result.result_summary
+        
+        if not result:
+            return {'error': 'Detection result not found'}, 404
+        
+        # Results are written once, so a matching ETag also skips the MongoDB lookup
+        etag = make_etag(result.result_id, result.detection_date)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        # Get MongoDB metadata
+        metadata = None
+        if result.metadata_id:
+            metadata = MongoDBModel.get_detection_metadata(result.metadata_id, DETECTION_DETAIL_PROJECTION)
+        
+        # Format response
+        response = {
+            'result_id': result.result_id,
+            'upload_id': result.upload_id,
+            'is_ai_generated': result.is_ai_generated,
+            'confidence_score': result.confidence_score,
+            'processing_time': result.processing_time,
+            'detection_date': result.detection_date,
+            'algorithm_version': result.algorithm_version,
+            'result_summary': result.result_summary
+        }
+        
+        # Add metadata if available
+        if metadata:
+            response['metadata'] = {
+                'exif_analysis': metadata.get('exif_data', {}).get('analysis_result', {}),
+                'pixel_analysis': {
+                    'prnu': metadata.get('pixel_analysis', {}).get('prnu_results', {}),
+                    'ela': metadata.get('pixel_analysis', {}).get('ela_results', {}),
+                    'texture': metadata.get('pixel_analysis', {}).get('texture_analysis', {})
+                },
+                'model_results': metadata.get('model_results', []),
+                'contributing_factors': metadata.get('aggregated_results', {}).get('contributing_factors', [])
             }
-            
-            # Add metadata if available
-            if metadata:
-                response['metadata'] = {
-                    'exif_analysis': metadata.get('exif_data', {}).get('analysis_result', {}),
-                    'pixel_analysis': {
-                        'prnu': metadata.get('pixel_analysis', {}).get('prnu_results', {}),
-                        'ela': metadata.get('pixel_analysis', {}).get('ela_results', {}),
-                        'texture': metadata.get('pixel_analysis', {}).get('texture_analysis', {})
-                    },
-                    'model_results': metadata.get('model_results', []),
-                    'contributing_factors': metadata.get('aggregated_results', {}).get('contributing_factors', [])
-                }
-            
-            return response, 200
-            
-        except Exception as e:
-            logger.error(f"Error in get detection result: {str(e)}")
-            return {'error': 'Failed to retrieve detection result'}, 500
+        
+        return etag_response(response, etag)
 
 class DetectionListResource(Resource):
     """Resource for detection result collection operations"""
     
-    @jwt_required()
+    @cached_jwt_required()
     def get(self):
         """Get all detection results for the current user"""
-        try:
-            current_user_id = get_jwt_identity()
-            
-            # Get pagination parameters
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
-            
-            # Query detection results
-            results = DetectionResult.query.join(Upload).filter(
-                Upload.user_id == current_user_id
-            ).order_by(DetectionResult.detection_date.desc()) \
-                .paginate(page=page, per_page=per_page)
+        current_user_id = get_current_user_id()
+        
+        # Query detection results, populating the upload from the existing join
+        query = DetectionResult.query.join(Upload) \
+            .options(contains_eager(DetectionResult.upload), raiseload('*')) \
+            .filter(Upload.user_id == current_user_id)
+        
+        # The total is cached per user instead of counted on every page
+        total = get_cached_total(f"detection_total:{current_user_id}", query)
+        
+        # Version the listing by its newest result and size before loading the page
+        last_detected = db.session.query(func.max(DetectionResult.detection_date)) \
+            .join(Upload) \
+            .filter(Upload.user_id == current_user_id) \
+            .scalar()
+        
+        etag = make_etag(current_user_id, last_detected, total, request.query_string.decode())
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        limit = get_page_limit()
+        page = request.args.get('page', type=int)
+        
+        if page:
+            # Page numbers are still accepted for clients that jump between pages
+            results = query.order_by(DetectionResult.detection_date.desc(), DetectionResult.result_id.desc()) \
+                .limit(limit) \
+                .offset((max(page, 1) - 1) * limit) \
+                .all()
             
-            # Format response
             response = {
                 'items': [],
-                'total': results.total,
-                'pages': results.pages,
-                'current_page': results.page
+                'total': total,
+                'pages': -(-total // limit),
+                'current_page': page
             }
+        else:
+            # Page by keyset instead of OFFSET
+            try:
+                results, has_more, next_cursor = keyset_paginate(
+                    query, DetectionResult.detection_date, DetectionResult.result_id, limit
+                )
+            except InvalidCursorError as e:
+                return {'error': str(e)}, 400
             
-            for result in results.items:
-                response['items'].append({
-                    'result_id': result.result_id,
-                    'upload_id': result.upload_id,
-                    'is_ai_generated': result.is_ai_generated,
-                    'confidence_score': float(result.confidence_score),
-                    'detection_date': result.detection_date.isoformat(),
-                    'algorithm_version': result.algorithm_version,
-                    'result_summary': result.result_summary
-                })
+            response = {
+                'items': [],
+                'total': total,
+                'has_more': has_more,
+                'next_cursor': next_cursor
+            }
+        
+        # Optionally enrich results with MongoDB metadata fetched in one round-trip
+        metadata_by_id = {}
+        if request.args.get('include_metadata', 'false').lower() == 'true':
+            metadata_by_id = MongoDBModel.get_detection_metadata_bulk(
+                [result.metadata_id for result in results if result.metadata_id],
+                projection={'aggregated_results.contributing_factors': 1}
+            )
+        
+        # Format response
+        for result in results:
+            item = {
+                'result_id': result.result_id,
+                'upload_id': result.upload_id,
+                'is_ai_generated': result.is_ai_generated,
+                'confidence_score': result.confidence_score,
+                'detection_date': result.detection_date,
+                'algorithm_version': result.algorithm_version,
+                'result_summary': result.result_summary
+            }
             
-            return response, 200
+            metadata = metadata_by_id.get(result.metadata_id)
+            if metadata:
+                item['contributing_factors'] = metadata.get('aggregated_results', {}).get('contributing_factors', [])
             
-        except Exception as e:
-            logger.error(f"Error in get detection results: {str(e)}")
-            return {'error': 'Failed to retrieve detection results'}, 500
+            response['items'].append(item)
+        
+        return etag_response(response, etag)
 
 class AuthResource(Resource):
     """Resource for authentication operations"""
     
     def post(self):
         """Login a user"""
-        try:
-            data = request.get_json()
-            
-            # Validate required fields
-            if 'username' not in data or 'password' not in data:
-                return {'error': 'Username and password are required'}, 400
-            
-            # Find user
-            user = User.query.filter_by(username=data['username']).first()
-            
-            # Verify password
-            from werkzeug.security import check_password_hash
-            from flask_jwt_extended import create_access_token, create_refresh_token
-            from datetime import datetime
-            
-            if not user or not check_password_hash(user.password_hash, data['password']):
-                return {'error': 'Invalid username or password'}, 401
-            
-            # Update last login
-            user.last_login = datetime.utcnow()
+        # Validate required fields; reqparse answers missing ones with a 400
+        data = _LOGIN_PARSER.parse_args()
+        
+        # Find user
+        user = User.query.filter_by(username=data['username']).first()
+        
+        # Verify password
+        if not user or not verify_password(user.password_hash, data['password']):
+            return {'error': 'Invalid username or password'}, 401
+        
+        # Upgrade legacy or outdated hashes while the plain-text password is available
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(data['password'])
             db.session.commit()
-            
-            # Generate tokens
-            access_token = create_access_token(identity=user.user_id)
-            refresh_token = create_refresh_token(identity=user.user_id)
-            
-            return {
-                'access_token': access_token,
-                'refresh_token': refresh_token,
-                'user_id': user.user_id,
-                'username': user.username
-            }, 200
-            
-        except Exception as e:
-            logger.error(f"Error in user login: {str(e)}")
-            return {'error': 'Login failed'}, 500
+        
+        # Record last login in Redis; a periodic task writes it to the database
+        last_login = record_login(user.user_id)
+        
+        # Warm the profile cache
+        cache_user(user, last_login=last_login)
+        
+        # Generate tokens
+        access_token = create_access_token(identity=user.user_id)
+        refresh_token = create_refresh_token(identity=user.user_id)
+        
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'user_id': user.user_id,
+            'username': user.username
+        }, 200
 
 class RefreshResource(Resource):
     """Resource for token refresh operations"""
     
-    @jwt_required(refresh=True)
+    @cached_jwt_required(refresh=True)
     def post(self):
         """Refresh access token"""
-        try:
-            from flask_jwt_extended import create_access_token
-            
-            current_user_id = get_jwt_identity()
-            access_token = create_access_token(identity=current_user_id)
-            
-            return {'access_token': access_token}, 200
-            
-        except Exception as e:
-            logger.error(f"Error in token refresh: {str(e)}")
-            return {'error': 'Token refresh failed'}, 500
+        current_user_id = get_current_user_id()
+        access_token = create_access_token(identity=current_user_id)
+        
+        return {'access_token': access_token}, 200
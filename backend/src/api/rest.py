@@ -0,0 +1,41 @@
+"""
+SkyGate Application - REST API
+This module defines the Flask-RESTful API blueprint and registers its resources.
+"""
+
+from flask import Blueprint
+from flask_restful import Api
+from werkzeug.exceptions import HTTPException
+
+from ..utils.serialization import output_json
+from .resources import (
+    UserResource, UserListResource,
+    UploadResource, UploadListResource, UploadExportResource,
+    DetectionResource, DetectionListResource,
+    AuthResource, RefreshResource
+)
+
+class RestApi(Api):
+    """Flask-RESTful Api that leaves unexpected exceptions to the application's error handlers"""
+    
+    def handle_error(self, e):
+        # Flask-RESTful falls back to the app's handlers when this raises
+        if not isinstance(e, HTTPException):
+            raise e
+        return super().handle_error(e)
+
+# Resources live on a blueprint so routing goes straight through Werkzeug's URL map;
+# unmatched URLs are left to Flask's own 404 handling
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+api = RestApi(api_bp, catch_all_404s=False)
+api.representations['application/json'] = output_json
+
+api.add_resource(UserResource, '/users/<int:user_id>')
+api.add_resource(UserListResource, '/users')
+api.add_resource(UploadResource, '/uploads/<int:upload_id>')
+api.add_resource(UploadListResource, '/uploads')
+api.add_resource(UploadExportResource, '/uploads/export')
+api.add_resource(DetectionResource, '/detections/<int:result_id>')
+api.add_resource(DetectionListResource, '/detections')
+api.add_resource(AuthResource, '/auth/login')
+api.add_resource(RefreshResource, '/auth/refresh')
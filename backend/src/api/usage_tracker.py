@@ -0,0 +1,227 @@
+"""
+SkyGate Application - Usage Tracker
+This module queues API usage records in Redis and writes them to PostgreSQL with COPY.
+"""
+
+import logging
+import time
+from datetime import date, datetime, timezone
+
+import orjson
+from celery.signals import beat_init
+from flask import request, g
+from sqlalchemy import text
+
+from ..celery_app import celery_app
+from ..models.postgresql_models import db, bulk_insert_with_copy
+from .auth_cache import get_current_user_id
+from .login_tracker import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# List of serialized usage rows awaiting a flush
+USAGE_LOGS_KEY = 'usage_logs'
+
+# Batch being written by a flush; kept until its COPY commits
+USAGE_LOGS_PROCESSING_KEY = 'usage_logs:processing'
+
+# Lock that keeps overlapping flushes from writing the same batch twice
+USAGE_FLUSH_LOCK_KEY = 'usage_logs:flush_lock'
+USAGE_FLUSH_LOCK_TIMEOUT = 300
+
+# Move up to ARGV[1] rows from the head of KEYS[1] to KEYS[2] in one step
+CLAIM_USAGE_BATCH_SCRIPT = """
+local rows = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #rows > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(rows))
+    redis.call('LTRIM', KEYS[1], #rows, -1)
+end
+return rows
+"""
+
+# Rows written per COPY
+USAGE_FLUSH_BATCH_SIZE = 1000
+
+# usage_logs columns, in the order rows are queued
+USAGE_LOG_COLUMNS = (
+    'user_id',
+    'api_key_id',
+    'request_type',
+    'request_path',
+    'request_date',
+    'response_code',
+    'processing_time',
+    'ip_address',
+    'user_agent'
+)
+
+def record_usage(request_type, request_path, response_code, processing_time,
+                 user_id=None, api_key_id=None, ip_address=None, user_agent=None):
+    """
+    Queue a usage log row without writing to PostgreSQL
+
+    Args:
+        request_type: Kind of request (e.g. the HTTP method or operation name)
+        request_path: Path that was requested
+        response_code: HTTP status code of the response
+        processing_time: Time spent handling the request, in seconds
+        user_id: ID of the requesting user, if known
+        api_key_id: ID of the API key used, if any
+        ip_address: Client IP address
+        user_agent: Client User-Agent header
+    """
+    row = (
+        user_id,
+        api_key_id,
+        request_type,
+        request_path,
+        datetime.now(timezone.utc).isoformat(),
+        response_code,
+        round(processing_time, 3),
+        ip_address,
+        user_agent
+    )
+    get_redis_client().rpush(USAGE_LOGS_KEY, orjson.dumps(row))
+
+def init_usage_tracking(app):
+    """Queue a usage row for every API request handled by the application"""
+    @app.before_request
+    def start_usage_timer():
+        g.usage_started_at = time.perf_counter()
+
+    @app.after_request
+    def queue_usage_row(response):
+        started_at = g.pop('usage_started_at', None)
+        if started_at is None or not request.path.startswith('/api/'):
+            return response
+
+        # Usage tracking must never fail the request it describes
+        try:
+            record_usage(
+                request.method,
+                request.path[:255],
+                response.status_code,
+                time.perf_counter() - started_at,
+                user_id=get_current_user_id(),
+                ip_address=request.remote_addr,
+                user_agent=request.user_agent.string or None
+            )
+        except Exception as e:
+            logger.warning("Failed to queue usage log: %s", e)
+
+        return response
+
+@celery_app.task(name='skygate.flush_usage_logs', ignore_result=True)
+def flush_usage_logs():
+    """
+    Write queued usage rows to usage_logs, one COPY per batch
+
+    Returns:
+        int: Number of rows written
+    """
+    client = get_redis_client()
+    written = 0
+
+    # Beat schedules a flush every second; a run that is still writing keeps the batch
+    lock = client.lock(USAGE_FLUSH_LOCK_KEY, timeout=USAGE_FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return written
+
+    try:
+        claim_batch = client.register_script(CLAIM_USAGE_BATCH_SCRIPT)
+
+        while True:
+            # A batch left by a failed flush is written before new rows are taken
+            pending = client.lrange(USAGE_LOGS_PROCESSING_KEY, 0, -1)
+            if not pending:
+                pending = claim_batch(
+                    keys=[USAGE_LOGS_KEY, USAGE_LOGS_PROCESSING_KEY],
+                    args=[USAGE_FLUSH_BATCH_SIZE]
+                )
+
+            if not pending:
+                return written
+
+            # If the COPY fails the batch stays in the processing list for the next run
+            written += bulk_insert_with_copy(
+                'usage_logs', USAGE_LOG_COLUMNS, [orjson.loads(row) for row in pending]
+            )
+            client.delete(USAGE_LOGS_PROCESSING_KEY)
+
+            if len(pending) < USAGE_FLUSH_BATCH_SIZE:
+                return written
+    finally:
+        lock.release()
+
+def _add_months(month_start, months):
+    """Return the first day of the month `months` after month_start"""
+    index = month_start.month - 1 + months
+    return date(month_start.year + index // 12, index % 12 + 1, 1)
+
+def _ensure_month_partition(name, start, end):
+    """
+    Create one monthly partition, moving any of its rows out of the default partition
+
+    Creating a partition directly fails once the default partition holds rows in its
+    range, so the table is built standalone, filled from the default partition and
+    then attached; PostgreSQL validates the default partition as part of the attach.
+
+    Returns:
+        bool: True if the partition was created
+    """
+    if db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+        return False
+
+    # Identifiers cannot be bound parameters; name and bounds are generated here
+    partition_bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    if not db.session.execute(text("SELECT to_regclass('usage_logs_default')")).scalar():
+        db.session.execute(text(f"CREATE TABLE {name} PARTITION OF usage_logs {partition_bounds}"))
+        return True
+
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE usage_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.session.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM usage_logs_default WHERE request_date >= :start AND request_date < :end "
+        f"RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), {'start': start, 'end': end})
+    db.session.execute(text(f"ALTER TABLE usage_logs ATTACH PARTITION {name} {partition_bounds}"))
+    return True
+
+@celery_app.task(name='skygate.ensure_usage_log_partitions', ignore_result=True)
+def ensure_usage_log_partitions(months_ahead=2):
+    """
+    Create the monthly usage_logs partitions for the current and upcoming months
+
+    Each month is created in its own transaction, so one failing month does not
+    keep the others from being created.
+
+    Args:
+        months_ahead: Number of months after the current one to create in advance
+
+    Returns:
+        list: Names of the partitions that were created
+    """
+    current_month = datetime.now(timezone.utc).date().replace(day=1)
+    created = []
+
+    for offset in range(months_ahead + 1):
+        start = _add_months(current_month, offset)
+        end = _add_months(start, 1)
+        name = f"usage_logs_{start:%Y_%m}"
+
+        try:
+            if _ensure_month_partition(name, start, end):
+                created.append(name)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to create usage_logs partition %s: %s", name, e)
+
+    return created
+
+@beat_init.connect
+def queue_partition_check(sender, **kwargs):
+    """Check the partitions when beat starts instead of waiting for the first daily run"""
+    ensure_usage_log_partitions.delay()
@@ -0,0 +1,61 @@
+"""
+SkyGate Application - User Cache
+This module provides a write-through cache for user profile lookups.
+"""
+
+from ..cache import cache
+from ..models.postgresql_models import User
+
+# How long a cached profile stays valid (seconds)
+USER_CACHE_TTL = 300
+
+def serialize_user(user):
+    """Convert a User model into its profile representation"""
+    return {
+        'user_id': user.user_id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'created_at': user.created_at,
+        'updated_at': user.updated_at,
+        'last_login': user.last_login,
+        'profile_image_url': user.profile_image_url
+    }
+
+def cache_user(user, **overrides):
+    """Store a user's profile in the cache and return it, applying any field overrides"""
+    profile = serialize_user(user)
+    profile.update(overrides)
+    cache.set(f"user:{user.user_id}", profile, timeout=USER_CACHE_TTL)
+    return profile
+
+def get_user_cached(user_id):
+    """
+    Get a user's profile, reading from the cache when possible
+    
+    Args:
+        user_id: ID of the user to look up
+        
+    Returns:
+        dict: The user's profile or None if the user does not exist
+    """
+    profile = cache.get(f"user:{user_id}")
+    
+    if profile is None:
+        user = User.query.filter_by(user_id=user_id).first()
+        if not user:
+            return None
+        profile = cache_user(user)
+    
+    return profile
+
+def invalidate_user(user_id):
+    """Remove a user's profile from the cache"""
+    cache.delete(f"user:{user_id}")
+
+def invalidate_users(user_ids):
+    """Remove several users' profiles from the cache in one call"""
+    keys = [f"user:{user_id}" for user_id in user_ids]
+    if keys:
+        cache.delete_many(*keys)
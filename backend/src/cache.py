@@ -0,0 +1,8 @@
+"""
+SkyGate Application - Cache
+This module defines the shared cache instance used across the application.
+"""
+
+from flask_caching import Cache
+
+cache = Cache()
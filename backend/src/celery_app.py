@@ -0,0 +1,69 @@
+"""
+SkyGate Application - Celery Application
+This module defines the Celery application used to run detection jobs outside the request cycle.
+"""
+
+import os
+from celery import Celery
+from celery.schedules import crontab
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+celery_app = Celery(
+    'skygate',
+    broker=os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'),
+    backend=os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
+    include=['src.detection.tasks', 'src.api.login_tracker', 'src.api.usage_tracker']
+)
+
+# GPU-bound detection work is routed to its own queue so it can be consumed by
+# a dedicated worker pool; everything else goes to the default queue.
+celery_app.conf.update(
+    task_default_queue='default',
+    task_routes={
+        'skygate.process_detection': {'queue': 'detection'},
+    },
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    result_expires=24 * 60 * 60,
+    # Detection tasks are GPU/memory-heavy, so keep concurrency low and never
+    # let a worker reserve more jobs than it can run. Workers consuming the
+    # default queue should override this (e.g. CELERY_WORKER_CONCURRENCY=8).
+    worker_concurrency=int(os.environ.get('CELERY_WORKER_CONCURRENCY', 2)),
+    worker_prefetch_multiplier=1,
+    # Acknowledge after completion so a crashed worker redelivers its in-flight task
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    broker_transport_options={
+        'visibility_timeout': int(os.environ.get('CELERY_VISIBILITY_TIMEOUT', 3600)),
+    },
+    # Periodic jobs, run by `celery beat`
+    beat_schedule={
+        'flush-login-timestamps': {
+            'task': 'skygate.flush_login_timestamps',
+            'schedule': float(os.environ.get('LOGIN_FLUSH_INTERVAL', 30)),
+        },
+        'flush-usage-logs': {
+            'task': 'skygate.flush_usage_logs',
+            'schedule': float(os.environ.get('USAGE_FLUSH_INTERVAL', 1)),
+        },
+        # Also queued when beat starts, so a fresh deployment does not wait a day
+        'ensure-usage-log-partitions': {
+            'task': 'skygate.ensure_usage_log_partitions',
+            'schedule': crontab(minute=5, hour=0),
+        },
+    },
+)
+
+def init_celery(app):
+    """Bind Celery tasks to the Flask application context"""
+    class ContextTask(celery_app.Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery_app.Task = ContextTask
+    return celery_app
@@ -0,0 +1,28 @@
+"""
+SkyGate Application - CLI Commands
+This module defines the `flask skygate` maintenance commands run at deploy time.
+"""
+
+import click
+from flask.cli import AppGroup
+
+from .models.mongodb_models import MongoDBModel
+
+skygate_cli = AppGroup('skygate', help='SkyGate maintenance commands.')
+
+@skygate_cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Create the MongoDB lookup indexes"""
+    # Runs once per deploy rather than in every server process, so no Mongo
+    # connection is opened before gunicorn or Celery fork their workers
+    MongoDBModel.ensure_indexes()
+    click.echo('MongoDB indexes are up to date.')
+
+@skygate_cli.command('ensure-partitions')
+@click.option('--months-ahead', default=2, show_default=True, help='Months after the current one to create.')
+def ensure_partitions_command(months_ahead):
+    """Create the monthly usage_logs partitions"""
+    from .api.usage_tracker import ensure_usage_log_partitions
+    
+    created = ensure_usage_log_partitions.run(months_ahead)
+    click.echo(f"Created partitions: {', '.join(created) or 'none'}")
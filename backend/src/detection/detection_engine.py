@@ -3,30 +3,178 @@ SkyGate Application - Core Detection Module
 This module implements the main AI detection algorithms for identifying AI-generated images.
 """
 
-import os
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 import cv2
 import numpy as np
 import torch
-import torchvision.transforms as transforms
-from PIL import Image
 import exifread
-from datetime import datetime
 import logging
-from sklearn.ensemble import VotingClassifier
+from ..utils.logging_utils import configure_logging
 
 from ..models.mongodb_models import MongoDBModel
 from ..utils.image_processing import (
+    DecodedImage,
+    load_image,
     extract_ela_features, 
     extract_prnu_features, 
     analyze_texture_smoothness,
     detect_visual_anomalies
 )
-from ..utils.metadata_analysis import analyze_exif_metadata
+from ..utils.metadata_analysis import analyze_exif_metadata, normalize_exif_tags
+from .tensorrt_runtime import TensorRTModel, tensorrt_available
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Allow TF32 tensor cores for any float32 matmuls left in the models
+torch.set_float32_matmul_precision('high')
+
+# Inference dtypes selectable through the 'precision' config key
+MODEL_DTYPES = {
+    'fp16': torch.float16,
+    'bf16': torch.bfloat16,
+    'fp32': torch.float32
+}
+
+# Metadata document fields written for each pixel analysis, with the defaults of
+# the scores it reports alongside is_suspicious/confidence
+PIXEL_ANALYSIS_FIELDS = {
+    'ela_analysis': ('pixel_analysis.ela_results', {'error_level_score': 0.0, 'ela_image_path': ''}),
+    'prnu_analysis': ('pixel_analysis.prnu_results', {'pattern_score': 0.0}),
+    'texture_analysis': ('pixel_analysis.texture_analysis', {'smoothness_score': 0.0})
+}
+
+# Display names of the models recorded under model_results
+MODEL_RESULT_NAMES = {
+    'vit_model': 'Vision Transformer',
+    'resnet_model': 'ResNet50 NoDown'
+}
+
+class _CallImage(DecodedImage):
+    """Decoded image of a single detect() call, carrying that call's shared-backbone forward"""
+    
+    def __new__(cls, decoded):
+        image = super().__new__(cls, *decoded)
+        # Future of the dual-head logits; lives and dies with this call
+        image.dual_head_result = None
+        return image
+
+class _BatchInferencer:
+    """Micro-batches single-image model calls from concurrent callers into one forward pass"""
+    
+    def __init__(self, model, device, dtype=torch.float32, max_batch_size=8, timeout_ms=10):
+        """
+        Initialize the inferencer and start its worker thread
+        
+        Args:
+            model: Model taking a [B, 3, H, W] tensor and returning logits
+            device: Device the model lives on
+            dtype: Floating point type of the model's parameters
+            max_batch_size: Largest batch sent to the model
+            timeout_ms: How long to wait for more requests after the first one arrives
+        """
+        self.model = model
+        self.device = device
+        self.dtype = dtype
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout_ms / 1000
+        self._requests = queue.Queue()
+        
+        # Staging buffers reused across batches of the same shape; only the worker
+        # thread touches them, and each batch finishes before the next is staged
+        self._host_buffers = {}
+        self._device_buffers = {}
+        
+        # A dedicated stream keeps copies and kernels off the default stream
+        self._stream = torch.cuda.Stream(device) if device.type == 'cuda' else None
+        
+        self._thread = threading.Thread(target=self._run, name='batch-inference', daemon=True)
+        self._thread.start()
+    
+    def infer(self, tensor):
+        """
+        Run a single preprocessed image through the model
+        
+        Args:
+            tensor: Input tensor of shape [3, H, W]
+            
+        Returns:
+            torch.Tensor: Logits for the image, on the CPU in float32
+        """
+        future = Future()
+        self._requests.put((tensor, future))
+        return future.result()
+    
+    def _collect_batch(self):
+        """Block for one request, then gather more until the batch is full or the window closes"""
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.timeout
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _buffers(self, shape, dtype):
+        """Return the pooled host and device buffers for a batch shape, allocating them once"""
+        if shape not in self._device_buffers:
+            pinned = self.device.type == 'cuda'
+            self._host_buffers[shape] = torch.empty(shape, dtype=dtype, pin_memory=pinned) if pinned else None
+            self._device_buffers[shape] = torch.empty(shape, dtype=self.dtype, device=self.device)
+        
+        return self._host_buffers[shape], self._device_buffers[shape]
+    
+    def _run(self):
+        """Worker loop that runs each collected batch and hands rows back to the callers"""
+        while True:
+            tensors, futures = zip(*self._collect_batch())
+            
+            try:
+                with torch.cuda.stream(self._stream) if self._stream is not None else nullcontext():
+                    # Stage the batch in pooled pinned memory so the device copy is asynchronous
+                    # and no allocation happens on the hot path
+                    shape = (len(tensors),) + tuple(tensors[0].shape)
+                    host, inputs = self._buffers(shape, tensors[0].dtype)
+                    
+                    if host is not None:
+                        torch.stack(tensors, out=host)
+                        inputs.copy_(host, non_blocking=True)
+                    else:
+                        inputs.copy_(torch.stack(tensors))
+                    
+                    with torch.inference_mode():
+                        outputs = self.model(inputs)
+                    
+                    # Softmax downstream runs in float32 for numerical safety; the copy
+                    # back to the host waits for this stream only
+                    logits = getattr(outputs, 'logits', outputs)
+                    
+                    # Multi-head models return one tensor per head; rows become [heads, classes]
+                    if isinstance(logits, (tuple, list)):
+                        logits = torch.stack(tuple(logits), dim=1)
+                    
+                    logits = logits.float().cpu()
+                
+                for future, row in zip(futures, logits):
+                    future.set_result(row)
+            except Exception as e:
+                logger.error("Error in batch inference: %s", e)
+                for future in futures:
+                    future.set_exception(e)
+
 class DetectionEngine:
     """Main detection engine that orchestrates the detection process"""
     
@@ -39,11 +187,34 @@ class DetectionEngine:
         """
         self.config = config or {}
         self.models = {}
+        self.classifiers = {}
         self.detection_methods = {}
         
+        # Models are loaded on the CPU; the inference device is chosen on first use
+        # so that no CUDA context exists before worker processes are forked
+        self.device = None
+        
+        # Batching front-ends for the GPU models, started with the inference device
+        self.inferencers = {}
+        self._device_lock = threading.Lock()
+        
+        # Guards the per-call shared-backbone forward futures
+        self._dual_head_lock = threading.Lock()
+        
         # Load detection models
         self.load_models()
         
+        # Detection methods and the visual anomaly pass are independent, so they run
+        # side by side; worker threads are started on first submit, after any fork of
+        # the loading process
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.detection_methods) + 1,
+            thread_name_prefix='detection'
+        )
+        
+        # Optional process pool for the CPU analyses, started with the inference device
+        self._cpu_pool = None
+        
     def load_models(self):
         """Load all detection models"""
         try:
@@ -53,14 +224,97 @@ class DetectionEngine:
             # Load ResNet50 NoDown model
             self.load_resnet_model()
             
+            # Load the distilled shared-backbone model that can stand in for both
+            self.load_dual_head_model()
+            
+            # Load trained classifiers for the pixel analyses
+            self.load_classifiers()
+            
             # Register detection methods
             self.register_detection_methods()
             
             logger.info("All detection models loaded successfully")
         except Exception as e:
-            logger.error(f"Error loading detection models: {str(e)}")
+            logger.error("Error loading detection models: %s", e)
             raise
     
+    @staticmethod
+    def load_weights(weights_path):
+        """
+        Load a state dict memory-mapped on the CPU
+        
+        Memory-mapped tensors are backed by the page cache, so worker processes
+        forked after loading share the weights copy-on-write instead of each
+        holding a private copy.
+        
+        Args:
+            weights_path: Path to a checkpoint saved with torch.save
+            
+        Returns:
+            dict: Model state dict
+        """
+        return torch.load(weights_path, map_location='cpu', mmap=True, weights_only=True)
+    
+    def ensure_device(self):
+        """
+        Select the inference device and move models to it
+        
+        Called lazily from detect() so the CUDA context is created inside each
+        worker process rather than in the parent before fork.
+        
+        Returns:
+            torch.device: The inference device
+        """
+        # Detection threads may race to the first call; set up the device exactly once
+        if self.device is None:
+            with self._device_lock:
+                if self.device is None:
+                    device = torch.device(
+                        self.config.get('device') or ('cuda' if torch.cuda.is_available() else 'cpu')
+                    )
+                    
+                    # Half precision halves weight and activation traffic and runs on tensor cores
+                    default_precision = 'fp16' if device.type == 'cuda' else 'fp32'
+                    dtype = MODEL_DTYPES[self.config.get('precision', default_precision)]
+                    
+                    for name, model in list(self.models.items()):
+                        # Prefer a prebuilt TensorRT engine (e.g. 'vit_trt_plan') when one is configured
+                        plan_path = self.config.get(f'{name}_trt_plan')
+                        if plan_path and device.type == 'cuda' and tensorrt_available():
+                            self.models[name] = TensorRTModel(plan_path)
+                            model_dtype = torch.float32
+                        elif isinstance(model, torch.nn.Module):
+                            self.models[name] = model.to(device, dtype=dtype).eval()
+                            model_dtype = dtype
+                        else:
+                            continue
+                        
+                        # Concurrent detections share forward passes through a micro-batcher
+                        self.inferencers[name] = _BatchInferencer(
+                            self.models[name],
+                            device,
+                            dtype=model_dtype,
+                            max_batch_size=self.config.get('batch_size', 8),
+                            timeout_ms=self.config.get('batch_timeout_ms', 10)
+                        )
+                    
+                    # Run the pure-Python-heavy CPU analyses in separate processes when asked to.
+                    # Spawned processes keep CUDA out of the children; this needs a parent that may
+                    # have children, e.g. a Celery worker started with --pool=threads or --pool=solo
+                    cpu_processes = self.config.get('cpu_processes')
+                    if cpu_processes:
+                        self._cpu_pool = ProcessPoolExecutor(
+                            max_workers=cpu_processes,
+                            mp_context=multiprocessing.get_context('spawn'),
+                            initializer=_init_cpu_worker,
+                            initargs=(self.config,)
+                        )
+                    
+                    # Publish the device last so callers never see half-initialized models
+                    self.device = device
+        
+        return self.device
+    
     def load_vit_model(self):
         """Load and initialize the Vision Transformer model"""
         try:
@@ -78,7 +332,7 @@ class DetectionEngine:
             self.models['vit'] = "ViT model placeholder"
             
         except Exception as e:
-            logger.error(f"Error loading ViT model: {str(e)}")
+            logger.error("Error loading ViT model: %s", e)
             raise
     
     def load_resnet_model(self):
@@ -88,48 +342,257 @@ class DetectionEngine:
             # In a real implementation, this would load the pre-trained ResNet50 model
             
             # Example:
-            # import torch
             # from torchvision.models import resnet50
-            # model = resnet50(pretrained=True)
-            # model.load_state_dict(torch.load('path/to/resnet50nodown.pth'))
+            # model = resnet50()
+            # model.load_state_dict(self.load_weights('path/to/resnet50nodown.pth'), assign=True)
             # self.models['resnet'] = model
             
+            from torchvision.transforms import v2
+            
+            # Preprocessing is built once and shared by every prediction. It works on
+            # uint8 CHW tensors, resizing before the float conversion
+            self.resnet_transform = v2.Compose([
+                v2.Resize(256, antialias=True),
+                v2.CenterCrop(224),
+                v2.ToDtype(torch.float32, scale=True),
+                v2.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+            ])
+            
+            # Optionally fuse the pipeline into compiled kernels
+            if self.config.get('compile_transforms'):
+                self.resnet_transform = torch.compile(self.resnet_transform, mode='reduce-overhead')
+            
             # For now, we'll just log that this would happen
             logger.info("ResNet50 NoDown model would be loaded here")
             self.models['resnet'] = "ResNet50 NoDown model placeholder"
             
         except Exception as e:
-            logger.error(f"Error loading ResNet model: {str(e)}")
+            logger.error("Error loading ResNet model: %s", e)
             raise
     
+    def load_dual_head_model(self):
+        """
+        Load the optional distilled ViT+ResNet model
+        
+        The model is a TorchScript module configured through 'dual_head_path'. It
+        runs one shared backbone and returns a (vit_logits, resnet_logits) pair,
+        replacing two full forward passes per image with one.
+        """
+        dual_head_path = self.config.get('dual_head_path')
+        if dual_head_path:
+            self.models['dual_head'] = torch.jit.load(dual_head_path, map_location='cpu')
+            logger.info("Loaded dual-head model from %s", dual_head_path)
+    
+    def dual_head_forward(self, image):
+        """
+        Run the shared-backbone model once per detect() call
+        
+        The ViT and ResNet predictors run concurrently for the same image; the
+        first caller runs the forward pass and the other waits for its result.
+        The result is held on the call's own image object, so it is released
+        with the call and never seen by another one.
+        
+        Args:
+            image: Decoded image of the detect() call (_CallImage)
+            
+        Returns:
+            torch.Tensor: Logits shaped [2, classes], ViT head first
+        """
+        with self._dual_head_lock:
+            future = image.dual_head_result
+            owner = future is None
+            if owner:
+                future = image.dual_head_result = Future()
+        
+        if owner:
+            try:
+                tensor = torch.from_numpy(np.ascontiguousarray(image.bgr[:, :, ::-1])).permute(2, 0, 1)
+                future.set_result(self.inferencers['dual_head'].infer(self.resnet_transform(tensor)))
+            except Exception as e:
+                future.set_exception(e)
+        
+        return future.result()
+    
+    def dual_head_prediction(self, image, head):
+        """
+        Build a model prediction result from one head of the shared-backbone model
+        
+        Args:
+            image: Decoded image of the detect() call (_CallImage)
+            head: Index of the head (0 for ViT, 1 for ResNet)
+            
+        Returns:
+            dict: Prediction results
+        """
+        start_time = time.perf_counter_ns()
+        logits = self.dual_head_forward(image)[head]
+        confidence_score = torch.softmax(logits, dim=0)[1].item()
+        
+        return {
+            'is_ai_generated': confidence_score > 0.5,
+            'confidence_score': confidence_score,
+            'processing_time': (time.perf_counter_ns() - start_time) * 1e-9
+        }
+    
+    def load_classifiers(self):
+        """
+        Load the optional trained classifiers for ELA and PRNU features
+        
+        Classifiers are scikit-learn estimators saved with joblib and configured
+        through 'ela_classifier_path' and 'prnu_classifier_path'. Analyses without
+        a classifier fall back to their fixed thresholds.
+        """
+        for name in ('ela', 'prnu'):
+            classifier_path = self.config.get(f'{name}_classifier_path')
+            if classifier_path:
+                # scikit-learn is only imported when a classifier is configured
+                import joblib
+                self.classifiers[name] = joblib.load(classifier_path)
+                logger.info("Loaded %s classifier from %s", name, classifier_path)
+    
+    def classify_features(self, name, features):
+        """
+        Score a feature vector with a loaded classifier
+        
+        Args:
+            name: Classifier name ('ela' or 'prnu')
+            features: 1-D feature vector from the matching extractor
+            
+        Returns:
+            float: Probability that the image is AI-generated, or None without a classifier
+        """
+        classifier = self.classifiers.get(name)
+        if classifier is None:
+            return None
+        
+        return float(classifier.predict_proba(features.reshape(1, -1))[0, 1])
+    
     def register_detection_methods(self):
-        """Register all detection methods with their weights"""
+        """
+        Register all detection methods with their weights and stages
+        
+        Methods run in stages of increasing cost: the CPU analyses first, then
+        the GPU models, which can be skipped once the outcome is already decided.
+        """
         self.detection_methods = {
             'metadata_analysis': {
                 'function': self.analyze_metadata,
-                'weight': 0.15
+                'weight': 0.15,
+                'stage': 0
             },
             'ela_analysis': {
                 'function': self.analyze_ela,
-                'weight': 0.20
+                'weight': 0.20,
+                'stage': 0
             },
             'prnu_analysis': {
                 'function': self.analyze_prnu,
-                'weight': 0.20
+                'weight': 0.20,
+                'stage': 0
             },
             'texture_analysis': {
                 'function': self.analyze_texture,
-                'weight': 0.15
+                'weight': 0.15,
+                'stage': 0
             },
             'vit_model': {
                 'function': self.predict_with_vit,
-                'weight': 0.15
+                'weight': 0.15,
+                'stage': 1
             },
             'resnet_model': {
                 'function': self.predict_with_resnet,
-                'weight': 0.15
+                'weight': 0.15,
+                'stage': 1
             }
         }
+        
+        # Method order and weights as arrays for the aggregation step
+        self._method_names = tuple(self.detection_methods)
+        self._method_weights = np.fromiter(
+            (method_info['weight'] for method_info in self.detection_methods.values()),
+            dtype=np.float64, count=len(self.detection_methods)
+        )
+        
+        # Method names grouped by stage, cheapest stage first
+        stages = sorted({method_info['stage'] for method_info in self.detection_methods.values()})
+        self._stages = [
+            tuple(name for name, method_info in self.detection_methods.items() if method_info['stage'] == stage)
+            for stage in stages
+        ]
+    
+    def is_decided(self, method_results, pending):
+        """
+        Check whether pending methods could still change the verdict
+        
+        The final confidence is bounded by assuming every pending method scores
+        0 or 1. If even those extremes keep it clearly on one side, the pending
+        methods can be skipped.
+        
+        Args:
+            method_results: Results of the methods run so far
+            pending: Names of the methods not run yet
+            
+        Returns:
+            bool: True if the outcome no longer depends on the pending methods
+        """
+        weighted_sum = 0.0
+        total_weight = 0.0
+        
+        for method_name, method_result in method_results.items():
+            if 'error' not in method_result:
+                weight = self.detection_methods[method_name]['weight']
+                weighted_sum += weight * method_result['confidence_score']
+                total_weight += weight
+        
+        remaining_weight = sum(self.detection_methods[name]['weight'] for name in pending)
+        bound_weight = total_weight + remaining_weight
+        
+        if total_weight == 0 or bound_weight == 0:
+            return False
+        
+        lower_bound = weighted_sum / bound_weight
+        upper_bound = (weighted_sum + remaining_weight) / bound_weight
+        
+        return lower_bound > 0.8 or upper_bound < 0.2
+    
+    def submit_method(self, method_name, image, exif_tags, image_path, shared_image=None):
+        """
+        Start a detection method on the thread pool, or on the CPU process pool
+        
+        Args:
+            method_name: Name of the registered detection method
+            image: Decoded image (DecodedImage)
+            exif_tags: EXIF tags read from the image file
+            image_path: Path to the image file
+            shared_image: Shared memory block holding image.bgr when the process pool is used
+            
+        Returns:
+            concurrent.futures.Future: Future resolving to the method result
+        """
+        if shared_image is not None and method_name in CPU_POOL_METHODS:
+            return self._cpu_pool.submit(
+                _run_cpu_method, method_name, shared_image.name, image.bgr.shape, image.bgr.dtype.str
+            )
+        
+        return self._executor.submit(
+            self.detection_methods[method_name]['function'], image, exif_tags, image_path
+        )
+    
+    @staticmethod
+    def share_image(image_bgr):
+        """
+        Copy an image into a shared memory block for the CPU process pool
+        
+        Args:
+            image_bgr: Decoded image (BGR, uint8)
+            
+        Returns:
+            multiprocessing.shared_memory.SharedMemory: Block the caller must close and unlink
+        """
+        shared_image = shared_memory.SharedMemory(create=True, size=image_bgr.nbytes)
+        np.ndarray(image_bgr.shape, dtype=image_bgr.dtype, buffer=shared_image.buf)[:] = image_bgr
+        return shared_image
     
     def detect(self, image_path, metadata_id=None):
         """
@@ -143,7 +606,10 @@ class DetectionEngine:
             dict: Detection results
         """
         try:
-            logger.info(f"Starting detection process for {image_path}")
+            logger.info("Starting detection process for %s", image_path)
+            
+            # Move models to the inference device on first use in this process
+            self.ensure_device()
             
             # Initialize results dictionary
             results = {
@@ -154,38 +620,72 @@ class DetectionEngine:
                 'contributing_factors': []
             }
             
-            start_time = datetime.now()
-            
-            # Run all detection methods
-            for method_name, method_info in self.detection_methods.items():
-                try:
-                    method_result = method_info['function'](image_path)
-                    results['method_results'][method_name] = method_result
-                except Exception as e:
-                    logger.error(f"Error in {method_name}: {str(e)}")
-                    results['method_results'][method_name] = {
-                        'is_ai_generated': False,
-                        'confidence_score': 0.0,
-                        'error': str(e)
+            # Time with the monotonic clock; wall-clock time can jump under NTP
+            start_time = time.perf_counter_ns()
+            
+            # Decode the image and read its EXIF tags once for all methods; MakerNote
+            # and thumbnail data are not analyzed, so exifread skips parsing them.
+            # The decoded arrays are cached, so wrap them in a per-call image
+            image = _CallImage(load_image(image_path))
+            with open(image_path, 'rb') as f:
+                exif_tags = normalize_exif_tags(exifread.process_file(f, details=False))
+            
+            # Run each stage's methods concurrently; OpenCV and torch release the GIL.
+            # Strict mode runs every method in one stage for audits
+            stages = [self._method_names] if self.config.get('strict') else self._stages
+            
+            # CPU pool processes read the image from shared memory instead of a pickled copy
+            shared_image = self.share_image(image.bgr) if self._cpu_pool is not None else None
+            
+            # The visual anomaly pass does not vote, so it runs alongside every stage
+            anomaly_future = self._executor.submit(detect_visual_anomalies, image)
+            
+            try:
+                for index, stage in enumerate(stages):
+                    futures = {
+                        method_name: self.submit_method(method_name, image, exif_tags, image_path, shared_image)
+                        for method_name in stage
                     }
+                    
+                    for method_name, future in futures.items():
+                        try:
+                            results['method_results'][method_name] = future.result()
+                        except Exception as e:
+                            logger.error("Error in %s: %s", method_name, e)
+                            results['method_results'][method_name] = {
+                                'is_ai_generated': False,
+                                'confidence_score': 0.0,
+                                'error': str(e)
+                            }
+                    
+                    # Skip the costlier stages once they can no longer change the verdict
+                    pending = [method_name for later in stages[index + 1:] for method_name in later]
+                    if pending and self.is_decided(results['method_results'], pending):
+                        results['skipped_methods'] = pending
+                        break
+            finally:
+                if shared_image is not None:
+                    shared_image.close()
+                    shared_image.unlink()
+            
+            # Collect the visual anomaly pass; it catches its own errors
+            results['visual_anomalies'] = anomaly_future.result()
             
             # Aggregate results using weighted average
             self.aggregate_results(results)
             
             # Calculate total processing time
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            results['processing_time'] = processing_time
+            results['processing_time'] = (time.perf_counter_ns() - start_time) * 1e-9
             
             # Update MongoDB metadata if provided
             if metadata_id:
                 self.update_metadata(metadata_id, results)
             
-            logger.info(f"Detection completed for {image_path}")
+            logger.info("Detection completed for %s", image_path)
             return results
             
         except Exception as e:
-            logger.error(f"Error in detection process: {str(e)}")
+            logger.error("Error in detection process: %s", e)
             raise
     
     def aggregate_results(self, results):
@@ -195,34 +695,42 @@ class DetectionEngine:
         Args:
             results: Results dictionary to update
         """
-        weighted_sum = 0.0
-        total_weight = 0.0
-        contributing_factors = []
+        method_results = results['method_results']
+        outcomes = [method_results.get(name) for name in self._method_names]
         
-        for method_name, method_info in self.detection_methods.items():
-            if method_name in results['method_results']:
-                method_result = results['method_results'][method_name]
-                
-                if 'error' not in method_result:
-                    weight = method_info['weight']
-                    confidence = method_result['confidence_score']
-                    weighted_sum += weight * confidence
-                    total_weight += weight
-                    
-                    # Add to contributing factors if significant
-                    if method_result['is_ai_generated'] and confidence > 0.6:
-                        contributing_factors.append({
-                            'factor': method_name,
-                            'weight': weight,
-                            'contribution': confidence
-                        })
+        # Methods that are missing or failed carry no weight
+        valid = np.fromiter(
+            (outcome is not None and 'error' not in outcome for outcome in outcomes),
+            dtype=bool, count=len(outcomes)
+        )
+        confidences = np.fromiter(
+            (outcome['confidence_score'] if ok else 0.0 for outcome, ok in zip(outcomes, valid)),
+            dtype=np.float64, count=len(outcomes)
+        )
+        flagged = np.fromiter(
+            (bool(outcome['is_ai_generated']) if ok else False for outcome, ok in zip(outcomes, valid)),
+            dtype=bool, count=len(outcomes)
+        )
+        
+        weights = self._method_weights * valid
+        total_weight = weights.sum()
         
         # Calculate final confidence score
         if total_weight > 0:
-            final_confidence = weighted_sum / total_weight
+            final_confidence = float(weights @ confidences / total_weight)
         else:
             final_confidence = 0.0
         
+        # Methods that flagged the image with high confidence are contributing factors
+        contributing_factors = [
+            {
+                'factor': self._method_names[i],
+                'weight': float(self._method_weights[i]),
+                'contribution': float(confidences[i])
+            }
+            for i in np.flatnonzero(flagged & (confidences > 0.6))
+        ]
+        
         # Determine if AI generated based on threshold
         is_ai_generated = final_confidence > 0.5
         
@@ -247,9 +755,11 @@ class DetectionEngine:
             }
         }
         
+        method_results = results['method_results']
+        
         # Update method-specific results
-        if 'metadata_analysis' in results['method_results']:
-            metadata_result = results['method_results']['metadata_analysis']
+        if 'metadata_analysis' in method_results:
+            metadata_result = method_results['metadata_analysis']
             update_data["exif_data"] = {
                 "analysis_result": {
                     "is_suspicious": metadata_result['is_ai_generated'],
@@ -258,75 +768,51 @@ class DetectionEngine:
                 }
             }
         
-        if 'ela_analysis' in results['method_results']:
-            ela_result = results['method_results']['ela_analysis']
-            update_data["pixel_analysis.ela_results"] = {
-                "error_level_score": ela_result.get('error_level_score', 0.0),
-                "is_suspicious": ela_result['is_ai_generated'],
-                "confidence": ela_result['confidence_score'],
-                "ela_image_path": ela_result.get('ela_image_path', '')
-            }
-        
-        if 'prnu_analysis' in results['method_results']:
-            prnu_result = results['method_results']['prnu_analysis']
-            update_data["pixel_analysis.prnu_results"] = {
-                "pattern_score": prnu_result.get('pattern_score', 0.0),
-                "is_suspicious": prnu_result['is_ai_generated'],
-                "confidence": prnu_result['confidence_score']
-            }
-        
-        if 'texture_analysis' in results['method_results']:
-            texture_result = results['method_results']['texture_analysis']
-            update_data["pixel_analysis.texture_analysis"] = {
-                "smoothness_score": texture_result.get('smoothness_score', 0.0),
-                "is_suspicious": texture_result['is_ai_generated'],
-                "confidence": texture_result['confidence_score']
-            }
+        for method_name, (field_path, score_fields) in PIXEL_ANALYSIS_FIELDS.items():
+            method_result = method_results.get(method_name)
+            if method_result is None:
+                continue
+            
+            fields = {key: method_result.get(key, default) for key, default in score_fields.items()}
+            fields["is_suspicious"] = method_result['is_ai_generated']
+            fields["confidence"] = method_result['confidence_score']
+            update_data[field_path] = fields
         
         # Update model results
-        model_results = []
-        
-        if 'vit_model' in results['method_results']:
-            vit_result = results['method_results']['vit_model']
-            model_results.append({
-                "model_name": "Vision Transformer",
+        model_results = [
+            {
+                "model_name": model_name,
                 "model_version": "1.0",
-                "is_ai_generated": vit_result['is_ai_generated'],
-                "confidence": vit_result['confidence_score'],
-                "processing_time": vit_result.get('processing_time', 0.0)
-            })
-        
-        if 'resnet_model' in results['method_results']:
-            resnet_result = results['method_results']['resnet_model']
-            model_results.append({
-                "model_name": "ResNet50 NoDown",
-                "model_version": "1.0",
-                "is_ai_generated": resnet_result['is_ai_generated'],
-                "confidence": resnet_result['confidence_score'],
-                "processing_time": resnet_result.get('processing_time', 0.0)
-            })
+                "is_ai_generated": method_results[method_name]['is_ai_generated'],
+                "confidence": method_results[method_name]['confidence_score'],
+                "processing_time": method_results[method_name].get('processing_time', 0.0)
+            }
+            for method_name, model_name in MODEL_RESULT_NAMES.items()
+            if method_name in method_results
+        ]
         
         if model_results:
             update_data["model_results"] = model_results
         
-        # Update MongoDB
-        MongoDBModel.update_detection_metadata(metadata_id, update_data)
+        if 'visual_anomalies' in results:
+            update_data["visual_anomalies.detected_anomalies"] = results['visual_anomalies']['detected_anomalies']
+        
+        # Queue the MongoDB update; it is written in the next bulk flush
+        MongoDBModel.queue_detection_metadata_update(metadata_id, update_data)
     
-    def analyze_metadata(self, image_path):
+    def analyze_metadata(self, image, exif_tags, image_path):
         """
         Analyze image metadata for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
             dict: Metadata analysis results
         """
         try:
-            # Open the image file for EXIF extraction
-            with open(image_path, 'rb') as f:
-                exif_tags = exifread.process_file(f)
-            
             # Analyze EXIF metadata
             metadata_result = analyze_exif_metadata(exif_tags)
             
@@ -337,18 +823,20 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in metadata analysis: {str(e)}")
+            logger.error("Error in metadata analysis: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
     
-    def analyze_ela(self, image_path):
+    def analyze_ela(self, image, exif_tags, image_path):
         """
         Perform Error Level Analysis (ELA) for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
@@ -356,16 +844,20 @@ class DetectionEngine:
         """
         try:
             # Extract ELA features
-            ela_features, ela_image_path = extract_ela_features(image_path)
+            ela_features, ela_image_path = extract_ela_features(
+                image, save_visualization=self.config.get('debug', False)
+            )
             
-            # Analyze ELA features
-            # This is a placeholder for actual analysis logic
-            # In a real implementation, this would use a trained classifier
+            # Analyze ELA features with the trained classifier when one is loaded,
+            # otherwise with a simple threshold
+            error_level_score = float(ela_features.mean())
+            confidence_score = self.classify_features('ela', ela_features)
             
-            # For demonstration, we'll use a simple threshold
-            error_level_score = np.mean(ela_features)
-            is_ai_generated = error_level_score > 0.5
-            confidence_score = min(error_level_score, 0.95)
+            if confidence_score is not None:
+                is_ai_generated = confidence_score > 0.5
+            else:
+                is_ai_generated = error_level_score > 0.5
+                confidence_score = min(error_level_score, 0.95)
             
             return {
                 'is_ai_generated': is_ai_generated,
@@ -375,18 +867,20 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in ELA analysis: {str(e)}")
+            logger.error("Error in ELA analysis: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
     
-    def analyze_prnu(self, image_path):
+    def analyze_prnu(self, image, exif_tags, image_path):
         """
         Perform Photo Response Non-Uniformity (PRNU) analysis for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
@@ -394,16 +888,18 @@ class DetectionEngine:
         """
         try:
             # Extract PRNU features
-            prnu_features = extract_prnu_features(image_path)
+            prnu_features = extract_prnu_features(image, denoiser=self.config.get('prnu_denoiser', 'gaussian'))
             
-            # Analyze PRNU features
-            # This is a placeholder for actual analysis logic
-            # In a real implementation, this would use a trained classifier
+            # Analyze PRNU features with the trained classifier when one is loaded,
+            # otherwise with a simple threshold
+            pattern_score = float(prnu_features.mean())
+            confidence_score = self.classify_features('prnu', prnu_features)
             
-            # For demonstration, we'll use a simple threshold
-            pattern_score = np.mean(prnu_features)
-            is_ai_generated = pattern_score < 0.3  # Lower PRNU indicates AI generation
-            confidence_score = min(1.0 - pattern_score, 0.95)
+            if confidence_score is not None:
+                is_ai_generated = confidence_score > 0.5
+            else:
+                is_ai_generated = pattern_score < 0.3  # Lower PRNU indicates AI generation
+                confidence_score = min(1.0 - pattern_score, 0.95)
             
             return {
                 'is_ai_generated': is_ai_generated,
@@ -412,18 +908,20 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in PRNU analysis: {str(e)}")
+            logger.error("Error in PRNU analysis: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
     
-    def analyze_texture(self, image_path):
+    def analyze_texture(self, image, exif_tags, image_path):
         """
         Analyze texture smoothness for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
@@ -431,7 +929,7 @@ class DetectionEngine:
         """
         try:
             # Analyze texture smoothness
-            smoothness_score = analyze_texture_smoothness(image_path)
+            smoothness_score = analyze_texture_smoothness(image)
             
             # Higher smoothness indicates AI generation
             is_ai_generated = smoothness_score > 0.6
@@ -444,24 +942,30 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in texture analysis: {str(e)}")
+            logger.error("Error in texture analysis: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
     
-    def predict_with_vit(self, image_path):
+    def predict_with_vit(self, image, exif_tags, image_path):
         """
         Use Vision Transformer model for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
             dict: ViT prediction results
         """
         try:
+            # The distilled shared-backbone model answers for both predictors when loaded
+            if 'dual_head' in self.inferencers:
+                return self.dual_head_prediction(image, 0)
+            
             # This is a placeholder for actual prediction code
             # In a real implementation, this would load the image and run it through the ViT model
             
@@ -469,12 +973,11 @@ class DetectionEngine:
             # from PIL import Image
             # from transformers import ViTFeatureExtractor
             # feature_extractor = ViTFeatureExtractor.from_pretrained("google/vit-base-patch16-224-in21k")
-            # image = Image.open(image_path).convert("RGB")
+            # image = Image.fromarray(cv2.cvtColor(image.bgr, cv2.COLOR_BGR2RGB))
             # inputs = feature_extractor(images=image, return_tensors="pt")
-            # outputs = self.models['vit'](**inputs)
-            # logits = outputs.logits
+            # logits = self.inferencers['vit'].infer(inputs['pixel_values'][0])
             # predicted_class = logits.argmax(-1).item()
-            # confidence = torch.softmax(logits, dim=-1)[0, predicted_class].item()
+            # confidence = torch.softmax(logits, dim=-1)[predicted_class].item()
             
             # For now, we'll just return a placeholder result
             # In a real implementation, this would be based on actual model prediction
@@ -488,40 +991,37 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in ViT prediction: {str(e)}")
+            logger.error("Error in ViT prediction: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
     
-    def predict_with_resnet(self, image_path):
+    def predict_with_resnet(self, image, exif_tags, image_path):
         """
         Use ResNet50 NoDown model for AI detection
         
         Args:
+            image: Decoded image (DecodedImage, or a BGR array in CPU pool processes)
+            exif_tags: EXIF tags read from the image file
             image_path: Path to the image file
             
         Returns:
             dict: ResNet prediction results
         """
         try:
+            # The distilled shared-backbone model answers for both predictors when loaded
+            if 'dual_head' in self.inferencers:
+                return self.dual_head_prediction(image, 1)
+            
             # This is a placeholder for actual prediction code
             # In a real implementation, this would load the image and run it through the ResNet model
             
             # Example:
-            # from PIL import Image
-            # import torchvision.transforms as transforms
-            # transform = transforms.Compose([
-            #     transforms.Resize(256),
-            #     transforms.CenterCrop(224),
-            #     transforms.ToTensor(),
-            #     transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            # ])
-            # image = Image.open(image_path).convert("RGB")
-            # input_tensor = transform(image).unsqueeze(0)
-            # output = self.models['resnet'](input_tensor)
-            # confidence = torch.softmax(output, dim=1)[0, 1].item()
+            # image = torch.from_numpy(np.ascontiguousarray(image.bgr[:, :, ::-1])).permute(2, 0, 1)
+            # output = self.inferencers['resnet'].infer(self.resnet_transform(image))
+            # confidence = torch.softmax(output, dim=0)[1].item()
             # is_ai_generated = confidence > 0.5
             
             # For now, we'll just return a placeholder result
@@ -536,9 +1036,60 @@ class DetectionEngine:
             }
             
         except Exception as e:
-            logger.error(f"Error in ResNet prediction: {str(e)}")
+            logger.error("Error in ResNet prediction: %s", e)
             return {
                 'is_ai_generated': False,
                 'confidence_score': 0.0,
                 'error': str(e)
             }
+
+# Process-wide engine; models are loaded once per process on first use
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine(config=None):
+    """
+    Return the process-wide detection engine, creating it on first call
+    
+    Args:
+        config: Optional configuration dictionary, used only when the engine is created
+        
+    Returns:
+        DetectionEngine: The shared engine
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = DetectionEngine(config)
+    
+    return _engine
+
+# Analyses that may run in the optional CPU process pool
+CPU_POOL_METHODS = frozenset({'ela_analysis', 'prnu_analysis', 'texture_analysis'})
+
+# Model-free engine used inside CPU pool processes
+_worker_engine = None
+
+def _init_cpu_worker(config):
+    """Prepare a CPU pool process with a model-free engine and the trained classifiers"""
+    global _worker_engine
+    _worker_engine = DetectionEngine.__new__(DetectionEngine)
+    _worker_engine.config = config
+    _worker_engine.classifiers = {}
+    _worker_engine.load_classifiers()
+    _worker_engine.register_detection_methods()
+
+def _run_cpu_method(method_name, shm_name, shape, dtype):
+    """Run a CPU analysis in a pool process on an image held in shared memory"""
+    shared_image = shared_memory.SharedMemory(name=shm_name)
+    
+    # The parent owns the block; stop this process's tracker from unlinking it
+    resource_tracker.unregister(shared_image._name, 'shared_memory')
+    
+    image_bgr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shared_image.buf)
+    try:
+        return _worker_engine.detection_methods[method_name]['function'](image_bgr, None, None)
+    finally:
+        del image_bgr
+        shared_image.close()
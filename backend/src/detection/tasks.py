@@ -0,0 +1,171 @@
+"""
+SkyGate Application - Detection Tasks
+This module defines the Celery tasks that run AI detection outside the request cycle.
+"""
+
+from datetime import datetime, timezone
+import os
+import logging
+from ..utils.logging_utils import configure_logging
+
+from celery.signals import celeryd_after_setup, worker_process_shutdown
+
+from ..celery_app import celery_app
+from ..models.postgresql_models import db, Upload, DetectionResult
+from ..models.mongodb_models import MongoDBModel
+from ..api.pagination import invalidate_cached_total
+
+# Configure logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@celeryd_after_setup.connect
+def preload_detection_engine(sender, instance, **kwargs):
+    """Load models in the worker parent so prefork children share the weights"""
+    # Sent once -Q has been applied and before the pool forks; workers that only
+    # consume the default queue never run detection, so they skip the models
+    detection_queue = celery_app.conf.task_routes['skygate.process_detection']['queue']
+    if detection_queue not in instance.app.amqp.queues.consume_from:
+        return
+
+    # The engine pulls in torch and OpenCV; importing it here keeps them out of the
+    # web processes, which import this module only to enqueue tasks
+    from .detection_engine import get_engine
+    get_engine()
+
+@worker_process_shutdown.connect
+def flush_metadata_updates(**kwargs):
+    """Write queued MongoDB updates before a pool process exits; atexit does not run there"""
+    MongoDBModel.flush_detection_metadata_updates()
+
+@celery_app.task(name='skygate.process_detection')
+def process_detection_task(upload_id):
+    """Run detection for an upload and persist the results"""
+    upload = Upload.query.filter_by(upload_id=upload_id).first()
+
+    if not upload:
+        logger.error("Upload not found for detection: %s", upload_id)
+        return {'status': 'not_found', 'upload_id': upload_id}
+
+    # Skip uploads that were already processed by an earlier task
+    if upload.is_processed and upload.detection_result:
+        return {
+            'status': 'completed',
+            'upload_id': upload.upload_id,
+            'result_id': upload.detection_result.result_id,
+            'is_ai_generated': upload.detection_result.is_ai_generated,
+            'confidence_score': upload.detection_result.confidence_score
+        }
+
+    # Status changes are written together with the result in a single commit
+    processing_started_at = datetime.now(timezone.utc)
+
+    try:
+        # Create MongoDB metadata document
+        metadata_id = MongoDBModel.create_detection_metadata(
+            result_id=None,  # Will be updated after detection result is created
+            upload_id=upload.upload_id,
+            user_id=upload.user_id,
+            file_info={
+                'file_name': upload.original_file_name,
+                'file_type': upload.file_type,
+                'file_size': upload.file_size
+            }
+        )
+
+        # Run detection
+        from .detection_engine import get_engine
+        detection_results = get_engine().detect(upload.file_path, str(metadata_id))
+
+        # Create detection result
+        new_result = DetectionResult(
+            upload_id=upload.upload_id,
+            is_ai_generated=detection_results['is_ai_generated'],
+            confidence_score=detection_results['confidence_score'],
+            processing_time=detection_results['processing_time'],
+            detection_date=datetime.now(timezone.utc),
+            algorithm_version='1.0',
+            result_summary=generate_result_summary(detection_results),
+            metadata_id=str(metadata_id)
+        )
+
+        db.session.add(new_result)
+        db.session.flush()  # Get the result_id without committing
+
+        # Update MongoDB metadata with result_id
+        MongoDBModel.update_detection_metadata(
+            metadata_id=str(metadata_id),
+            update_data={'result_id': new_result.result_id}
+        )
+
+        # Update upload status
+        upload.is_processed = True
+        upload.processing_started_at = processing_started_at
+        upload.processing_completed_at = datetime.now(timezone.utc)
+
+        # Persist the result and status atomically; a failure rolls back all of it
+        db.session.commit()
+
+        # Keep the cached detection listing total in step with the new row
+        invalidate_cached_total(f"detection_total:{upload.user_id}")
+
+        return {
+            'status': 'completed',
+            'upload_id': upload.upload_id,
+            'result_id': new_result.result_id,
+            'is_ai_generated': new_result.is_ai_generated,
+            'confidence_score': new_result.confidence_score
+        }
+
+    except Exception as e:
+        logger.error("Error in detection processing: %s", e)
+        db.session.rollback()
+        raise
+
+@celery_app.task(name='skygate.delete_file', ignore_result=True)
+def delete_file_task(file_path):
+    """Remove an upload's file from disk after its database row has been deleted"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+# Helper functions
+FACTOR_TEMPLATES = {
+    'metadata_analysis': 'suspicious metadata patterns ({:.1%} confidence)',
+    'ela_analysis': 'error level analysis ({:.1%} confidence)',
+    'prnu_analysis': 'photo response non-uniformity ({:.1%} confidence)',
+    'texture_analysis': 'unnatural texture smoothness ({:.1%} confidence)',
+    'vit_model': 'Vision Transformer model detection ({:.1%} confidence)',
+    'resnet_model': 'ResNet model detection ({:.1%} confidence)'
+}
+
+AUTHENTIC_SUMMARY_TEMPLATE = (
+    "This image appears to be authentic with {:.1%} confidence. "
+    "No significant indicators of AI generation were detected."
+)
+
+def generate_result_summary(detection_results):
+    """Generate a human-readable summary of detection results"""
+    try:
+        confidence = detection_results['confidence_score']
+
+        if not detection_results['is_ai_generated']:
+            return AUTHENTIC_SUMMARY_TEMPLATE.format(1 - confidence)
+
+        summary = f"This image is likely AI-generated with {confidence:.1%} confidence. "
+
+        contributing_factors = detection_results.get('contributing_factors', [])
+        if contributing_factors:
+            factor_descriptions = [
+                FACTOR_TEMPLATES[factor['factor']].format(factor['contribution'])
+                for factor in contributing_factors
+                if factor['factor'] in FACTOR_TEMPLATES
+            ]
+            summary += "Key indicators include: " + ", ".join(factor_descriptions) + "."
+
+        return summary
+
+    except Exception as e:
+        logger.error("Error in generate result summary: %s", e)
+        return "Detection completed, but summary generation failed."
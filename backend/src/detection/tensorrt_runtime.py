@@ -0,0 +1,166 @@
+"""
+SkyGate Application - TensorRT Runtime
+This module builds TensorRT engines from exported ONNX models and runs them in place of the PyTorch models.
+"""
+
+import os
+import logging
+import numpy as np
+import torch
+from ..utils.logging_utils import configure_logging
+
+try:
+    import tensorrt as trt
+except ImportError:
+    trt = None
+
+# Configure logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
+TRT_LOGGER = trt.Logger(trt.Logger.WARNING) if trt else None
+
+def tensorrt_available():
+    """Return True if TensorRT and a CUDA device are available"""
+    return trt is not None and torch.cuda.is_available()
+
+def _make_calibrator(calibration_batches, cache_path):
+    """
+    Create an INT8 entropy calibrator fed from preprocessed batches
+    
+    Args:
+        calibration_batches: Iterable of float32 arrays shaped [B, 3, H, W]
+        cache_path: File the calibration table is read from and written to
+    
+    Returns:
+        trt.IInt8EntropyCalibrator2: Calibrator for the builder config
+    """
+    class EntropyCalibrator(trt.IInt8EntropyCalibrator2):
+        def __init__(self):
+            super().__init__()
+            self.batches = iter(calibration_batches)
+            self.device_batch = None
+        
+        def get_batch_size(self):
+            return self.device_batch.shape[0] if self.device_batch is not None else 1
+        
+        def get_batch(self, names):
+            batch = next(self.batches, None)
+            if batch is None:
+                return None
+            
+            # Keep the device tensor alive until TensorRT asks for the next batch
+            self.device_batch = torch.from_numpy(np.ascontiguousarray(batch, dtype=np.float32)).cuda()
+            return [int(self.device_batch.data_ptr())]
+        
+        def read_calibration_cache(self):
+            if os.path.exists(cache_path):
+                with open(cache_path, 'rb') as f:
+                    return f.read()
+            return None
+        
+        def write_calibration_cache(self, cache):
+            with open(cache_path, 'wb') as f:
+                f.write(cache)
+    
+    return EntropyCalibrator()
+
+def build_engine(onnx_path, plan_path, int8=False, calibration_batches=None, workspace_gb=4):
+    """
+    Build a serialized TensorRT engine from an ONNX model
+    
+    Args:
+        onnx_path: Path to the exported ONNX model
+        plan_path: Path the serialized engine is written to
+        int8: Whether to enable INT8 post-training quantization
+        calibration_batches: Preprocessed batches used to calibrate INT8 ranges
+        workspace_gb: Builder workspace memory limit in GiB
+    
+    Returns:
+        str: Path to the serialized engine
+    """
+    if trt is None:
+        raise RuntimeError("TensorRT is not installed")
+    
+    builder = trt.Builder(TRT_LOGGER)
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, TRT_LOGGER)
+    
+    with open(onnx_path, 'rb') as f:
+        if not parser.parse(f.read()):
+            errors = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+            raise RuntimeError(f"Could not parse ONNX model {onnx_path}: {errors}")
+    
+    config = builder.create_builder_config()
+    config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace_gb << 30)
+    
+    # FP16 covers the layers INT8 calibration leaves in higher precision
+    config.set_flag(trt.BuilderFlag.FP16)
+    
+    if int8:
+        if calibration_batches is None:
+            raise ValueError("INT8 engines require calibration batches")
+        config.set_flag(trt.BuilderFlag.INT8)
+        config.int8_calibrator = _make_calibrator(calibration_batches, f"{plan_path}.calib")
+    
+    serialized = builder.build_serialized_network(network, config)
+    if serialized is None:
+        raise RuntimeError(f"TensorRT engine build failed for {onnx_path}")
+    
+    with open(plan_path, 'wb') as f:
+        f.write(serialized)
+    
+    logger.info("Built TensorRT engine %s", plan_path)
+    return plan_path
+
+class TensorRTModel:
+    """Callable wrapper that runs a serialized TensorRT engine on torch tensors"""
+    
+    def __init__(self, plan_path):
+        """
+        Deserialize an engine and create its execution context
+        
+        Args:
+            plan_path: Path to a serialized TensorRT engine
+        """
+        if trt is None:
+            raise RuntimeError("TensorRT is not installed")
+        
+        with open(plan_path, 'rb') as f:
+            self.engine = trt.Runtime(TRT_LOGGER).deserialize_cuda_engine(f.read())
+        
+        self.context = self.engine.create_execution_context()
+        self.stream = torch.cuda.Stream()
+        
+        names = [self.engine.get_tensor_name(i) for i in range(self.engine.num_io_tensors)]
+        self.input_name = next(n for n in names if self.engine.get_tensor_mode(n) == trt.TensorIOMode.INPUT)
+        self.output_name = next(n for n in names if self.engine.get_tensor_mode(n) == trt.TensorIOMode.OUTPUT)
+    
+    def __call__(self, inputs):
+        """
+        Run a batch through the engine
+        
+        Args:
+            inputs: CUDA float32 tensor shaped [B, 3, H, W]
+        
+        Returns:
+            torch.Tensor: Output logits on the CUDA device
+        """
+        inputs = inputs.contiguous().float()
+        self.context.set_input_shape(self.input_name, tuple(inputs.shape))
+        
+        outputs = torch.empty(
+            tuple(self.context.get_tensor_shape(self.output_name)),
+            dtype=torch.float32,
+            device=inputs.device
+        )
+        
+        self.context.set_tensor_address(self.input_name, inputs.data_ptr())
+        self.context.set_tensor_address(self.output_name, outputs.data_ptr())
+        
+        # Run on a private stream ordered after the input copy
+        self.stream.wait_stream(torch.cuda.current_stream())
+        self.context.execute_async_v3(self.stream.cuda_stream)
+        torch.cuda.current_stream().wait_stream(self.stream)
+        
+        return outputs
@@ -3,27 +3,150 @@ SkyGate Application - MongoDB Models
 This module defines the MongoDB models and connection utilities.
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.server_api import ServerApi
+from pymongo.errors import PyMongoError
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timezone
 import os
+import atexit
+import threading
+import logging
 from dotenv import load_dotenv
+from ..utils.logging_utils import configure_logging
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # MongoDB connection
 mongo_uri = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/skygate')
-client = MongoClient(mongo_uri)
+client = MongoClient(
+    mongo_uri,
+    # Compress the wire protocol; large analysis documents shrink several-fold
+    compressors='zstd,snappy,zlib',
+    # Size the pool to the threads of one process rather than the default of 100
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 32)),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 4)),
+    serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 2000)),
+    retryWrites=True,
+    w=1,
+    appname='skygate',
+    server_api=ServerApi('1'),
+    # Connect on first use so preloading servers do not open sockets before forking
+    connect=False
+)
 db = client.get_database()
 
 # Collections
 detection_metadata = db.detection_metadata
 system_configuration = db.system_configuration
 
+class BulkUpdateBuffer:
+    """Buffers update operations and writes them with bulk_write from a background thread"""
+    
+    def __init__(self, collection, max_ops=50, flush_interval=0.2):
+        """
+        Initialize the buffer
+        
+        Args:
+            collection: Collection the updates are written to
+            max_ops: Number of buffered operations that triggers an immediate flush
+            flush_interval: Maximum seconds an operation waits before being written
+        """
+        self.collection = collection
+        self.max_ops = max_ops
+        self.flush_interval = flush_interval
+        self._ops = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._owner_pid = None
+    
+    def add(self, operation):
+        """
+        Queue an operation for the next bulk write
+        
+        Args:
+            operation: A pymongo write model such as UpdateOne
+        """
+        with self._lock:
+            # Start the flusher lazily, and again in each forked child
+            if self._owner_pid != os.getpid():
+                self._owner_pid = os.getpid()
+                threading.Thread(target=self._run, name='mongo-bulk-writer', daemon=True).start()
+            
+            self._ops.append(operation)
+            full = len(self._ops) >= self.max_ops
+        
+        if full:
+            self._wakeup.set()
+    
+    def flush(self):
+        """Write all queued operations in one unordered bulk_write"""
+        with self._lock:
+            operations, self._ops = self._ops, []
+        
+        if not operations:
+            return
+        
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            logger.error("Error in bulk metadata write: %s", e)
+    
+    def _run(self):
+        """Flush on a timer, or early when the buffer fills"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+# Fields read when a detection result is shown in full
+DETECTION_DETAIL_PROJECTION = {
+    "exif_data.analysis_result": 1,
+    "pixel_analysis": 1,
+    "model_results": 1,
+    "aggregated_results.contributing_factors": 1
+}
+
+# Fields listed when configurations are browsed without their parameters
+CONFIG_SUMMARY_PROJECTION = {
+    "config_name": 1,
+    "config_type": 1,
+    "is_active": 1,
+    "updated_at": 1
+}
+
+# Detection result updates are written in batches off the detection path
+metadata_update_buffer = BulkUpdateBuffer(detection_metadata)
+atexit.register(metadata_update_buffer.flush)
+
 class MongoDBModel:
     """Base class for MongoDB models with common operations"""
     
+    @staticmethod
+    def ensure_indexes():
+        """
+        Create the indexes used by the lookup methods
+        
+        Index creation is idempotent, so this is safe to run on every deploy.
+        result_id is only set after the PostgreSQL row exists, so its unique
+        index covers integer values only.
+        """
+        try:
+            detection_metadata.create_index(
+                "result_id",
+                unique=True,
+                partialFilterExpression={"result_id": {"$type": "int"}}
+            )
+            detection_metadata.create_index([("user_id", 1), ("created_at", -1)])
+            system_configuration.create_index([("config_type", 1), ("is_active", 1)])
+        except PyMongoError as e:
+            logger.error("Error creating MongoDB indexes: %s", e)
+    
     @staticmethod
     def create_detection_metadata(result_id, upload_id, user_id, file_info=None):
         """
@@ -38,6 +161,7 @@ class MongoDBModel:
         Returns:
             ObjectId: The ID of the created document
         """
+        now = datetime.now(timezone.utc)
         metadata_doc = {
             "result_id": result_id,
             "upload_id": upload_id,
@@ -77,8 +201,8 @@ class MongoDBModel:
                 "confidence_score": 0.0,
                 "contributing_factors": []
             },
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
         }
         
         result = detection_metadata.insert_one(metadata_doc)
@@ -96,7 +220,7 @@ class MongoDBModel:
         Returns:
             bool: True if update was successful, False otherwise
         """
-        update_data["updated_at"] = datetime.utcnow()
+        update_data["updated_at"] = datetime.now(timezone.utc)
         
         result = detection_metadata.update_one(
             {"_id": ObjectId(metadata_id)},
@@ -106,30 +230,74 @@ class MongoDBModel:
         return result.modified_count > 0
     
     @staticmethod
-    def get_detection_metadata(metadata_id):
+    def queue_detection_metadata_update(metadata_id, update_data):
+        """
+        Queue an update of a detection metadata document for the next bulk write
+        
+        Args:
+            metadata_id: The ID of the document to update
+            update_data: Dictionary containing fields to update
+        """
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        
+        metadata_update_buffer.add(
+            UpdateOne({"_id": ObjectId(metadata_id)}, {"$set": update_data}, upsert=False)
+        )
+    
+    @staticmethod
+    def flush_detection_metadata_updates():
+        """Write any queued detection metadata updates immediately"""
+        metadata_update_buffer.flush()
+    
+    @staticmethod
+    def get_detection_metadata(metadata_id, projection=None):
         """
         Retrieve a detection metadata document by ID
         
         Args:
             metadata_id: The ID of the document to retrieve
+            projection: Optional projection limiting the returned fields
             
         Returns:
             dict: The retrieved document or None if not found
         """
-        return detection_metadata.find_one({"_id": ObjectId(metadata_id)})
+        return detection_metadata.find_one({"_id": ObjectId(metadata_id)}, projection)
     
     @staticmethod
-    def get_detection_metadata_by_result_id(result_id):
+    def get_detection_metadata_bulk(metadata_ids, projection=None):
+        """
+        Retrieve several detection metadata documents with a single query
+        
+        Args:
+            metadata_ids: Iterable of document IDs to retrieve
+            projection: Optional projection limiting the returned fields
+            
+        Returns:
+            dict: Mapping of document ID string to document
+        """
+        object_ids = [ObjectId(i) for i in set(metadata_ids) if ObjectId.is_valid(i)]
+        
+        if not object_ids:
+            return {}
+        
+        return {
+            str(doc['_id']): doc
+            for doc in detection_metadata.find({"_id": {"$in": object_ids}}, projection)
+        }
+    
+    @staticmethod
+    def get_detection_metadata_by_result_id(result_id, projection=None):
         """
         Retrieve a detection metadata document by result_id
         
         Args:
             result_id: The result_id to search for
+            projection: Optional projection limiting the returned fields
             
         Returns:
             dict: The retrieved document or None if not found
         """
-        return detection_metadata.find_one({"result_id": result_id})
+        return detection_metadata.find_one({"result_id": result_id}, projection)
     
     @staticmethod
     def create_system_config(config_name, config_type, parameters, created_by=None):
@@ -145,13 +313,14 @@ class MongoDBModel:
         Returns:
             ObjectId: The ID of the created document
         """
+        now = datetime.now(timezone.utc)
         config_doc = {
             "config_name": config_name,
             "config_type": config_type,
             "parameters": parameters,
             "is_active": True,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "created_at": now,
+            "updated_at": now,
             "created_by": created_by
         }
         
@@ -159,12 +328,13 @@ class MongoDBModel:
         return result.inserted_id
     
     @staticmethod
-    def get_active_config(config_type):
+    def get_active_config(config_type, projection=None):
         """
         Retrieve active configuration of a specific type
         
         Args:
             config_type: Type of configuration to retrieve
+            projection: Optional projection limiting the returned fields
             
         Returns:
             dict: The retrieved configuration or None if not found
@@ -172,21 +342,27 @@ class MongoDBModel:
         return system_configuration.find_one({
             "config_type": config_type,
             "is_active": True
-        })
+        }, projection)
     
     @staticmethod
-    def get_all_configs(config_type=None):
+    def get_all_configs(config_type=None, as_cursor=False):
         """
         Retrieve all configurations, optionally filtered by type
         
         Args:
             config_type: Optional type of configurations to retrieve
+            as_cursor: Return a lazily iterated cursor over the summary fields
+                instead of a list of full documents
             
         Returns:
-            list: List of configuration documents
+            list: List of configuration documents, or a cursor if as_cursor is set
         """
         query = {}
         if config_type:
             query["config_type"] = config_type
+        
+        if as_cursor:
+            # Leave the parameters blobs on the server and fetch in batches
+            return system_configuration.find(query, CONFIG_SUMMARY_PROJECTION).batch_size(100)
             
         return list(system_configuration.find(query))
@@ -3,28 +3,43 @@ SkyGate Application - Database Models
 This module defines the SQLAlchemy models for the PostgreSQL database.
 """
 
-from datetime import datetime
+import io
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import DDL, event, func
+from sqlalchemy.dialects.postgresql import CITEXT, JSONB
 
 db = SQLAlchemy()
 
+# CITEXT columns need the extension before the first table is created
+event.listen(
+    db.metadata,
+    'before_create',
+    DDL("CREATE EXTENSION IF NOT EXISTS citext").execute_if(dialect='postgresql')
+)
+
 class User(db.Model):
     """User model for authentication and user management"""
     __tablename__ = 'users'
     
     user_id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(50), unique=True, nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
+    # Case-insensitive, so the unique constraints also reject case variants
+    username = db.Column(CITEXT, unique=True, nullable=False)
+    email = db.Column(CITEXT, unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_login = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    last_login = db.Column(db.DateTime(timezone=True))
     account_status = db.Column(db.String(20), default='active')
     profile_image_url = db.Column(db.String(255))
     
+    # CITEXT has no length; keep the limits the VARCHAR columns enforced
+    __table_args__ = (
+        db.CheckConstraint('char_length(username) <= 50', name='ck_users_username_length'),
+        db.CheckConstraint('char_length(email) <= 100', name='ck_users_email_length'),
+    )
+    
     # Relationships
     uploads = db.relationship('Upload', backref='user', lazy=True, cascade='all, delete-orphan')
     api_keys = db.relationship('ApiKey', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -45,11 +60,19 @@ class Upload(db.Model):
     file_size = db.Column(db.BigInteger, nullable=False)
     file_type = db.Column(db.String(50), nullable=False)
     mime_type = db.Column(db.String(100), nullable=False)
-    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    upload_date = db.Column(db.DateTime(timezone=True), server_default=func.now())
     is_processed = db.Column(db.Boolean, default=False)
-    processing_started_at = db.Column(db.DateTime)
-    processing_completed_at = db.Column(db.DateTime)
+    processing_started_at = db.Column(db.DateTime(timezone=True))
+    processing_completed_at = db.Column(db.DateTime(timezone=True))
     thumbnail_path = db.Column(db.String(255))
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Supports keyset pagination of a user's uploads, newest first
+        db.Index('idx_uploads_user_date_id', user_id, upload_date.desc(), upload_id.desc()),
+        # Ownership-checked lookups by (upload_id, user_id) resolve from a single index
+        db.Index('idx_uploads_user_upload', user_id, upload_id, unique=True),
+    )
     
     # Relationships
     detection_result = db.relationship('DetectionResult', backref='upload', lazy=True, uselist=False, cascade='all, delete-orphan')
@@ -65,13 +88,22 @@ class DetectionResult(db.Model):
     result_id = db.Column(db.Integer, primary_key=True)
     upload_id = db.Column(db.Integer, db.ForeignKey('uploads.upload_id', ondelete='CASCADE'), nullable=False)
     is_ai_generated = db.Column(db.Boolean)
-    confidence_score = db.Column(db.Numeric(5, 4), nullable=False)
-    processing_time = db.Column(db.Numeric(10, 3), nullable=False)  # in seconds
-    detection_date = db.Column(db.DateTime, default=datetime.utcnow)
+    confidence_score = db.Column(db.Float, nullable=False)
+    processing_time = db.Column(db.Float, nullable=False)  # in seconds
+    detection_date = db.Column(db.DateTime(timezone=True), server_default=func.now())
     algorithm_version = db.Column(db.String(50), nullable=False)
     result_summary = db.Column(db.Text)
     metadata_id = db.Column(db.String(50))  # Reference to MongoDB document ID
     
+    # Drives the uploads -> detection_results join; the included verdict columns
+    # let listings read them with an index-only scan
+    __table_args__ = (
+        db.Index(
+            'idx_detection_results_upload_id', upload_id,
+            postgresql_include=['is_ai_generated', 'confidence_score']
+        ),
+    )
+    
     # Relationships
     method_results = db.relationship('MethodResult', backref='detection_result', lazy=True, cascade='all, delete-orphan')
     
@@ -87,9 +119,9 @@ class DetectionMethod(db.Model):
     method_name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     is_active = db.Column(db.Boolean, default=True)
-    weight = db.Column(db.Numeric(3, 2), default=1.00)  # For weighted ensemble approach
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    weight = db.Column(db.Float, default=1.0)  # For weighted ensemble approach
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     method_results = db.relationship('MethodResult', backref='detection_method', lazy=True)
@@ -106,13 +138,29 @@ class MethodResult(db.Model):
     result_id = db.Column(db.Integer, db.ForeignKey('detection_results.result_id', ondelete='CASCADE'), nullable=False)
     method_id = db.Column(db.Integer, db.ForeignKey('detection_methods.method_id', ondelete='CASCADE'), nullable=False)
     is_ai_generated = db.Column(db.Boolean)
-    confidence_score = db.Column(db.Numeric(5, 4), nullable=False)
-    processing_time = db.Column(db.Numeric(10, 3), nullable=False)  # in seconds
+    confidence_score = db.Column(db.Float, nullable=False)
+    processing_time = db.Column(db.Float, nullable=False)  # in seconds
     result_details = db.Column(JSONB)  # Allows storing method-specific results
     
+    # Serves containment queries (result_details @> '{...}'); jsonb_path_ops keeps it compact
+    __table_args__ = (
+        db.Index(
+            'idx_method_results_details', result_details,
+            postgresql_using='gin',
+            postgresql_ops={'result_details': 'jsonb_path_ops'}
+        ),
+    )
+    
     def __repr__(self):
         return f'<MethodResult {self.method_result_id}>'
 
+# Toasted result_details values decompress faster with LZ4 than the default pglz (PostgreSQL 14+)
+event.listen(
+    MethodResult.__table__,
+    'after_create',
+    DDL("ALTER TABLE method_results ALTER COLUMN result_details SET COMPRESSION lz4").execute_if(dialect='postgresql')
+)
+
 
 class ApiKey(db.Model):
     """API key model for API access management"""
@@ -122,13 +170,23 @@ class ApiKey(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     api_key = db.Column(db.String(100), unique=True, nullable=False)
     key_name = db.Column(db.String(100), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime)
-    last_used_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    expires_at = db.Column(db.DateTime(timezone=True))
+    last_used_at = db.Column(db.DateTime(timezone=True))
     is_active = db.Column(db.Boolean, default=True)
     request_limit = db.Column(db.Integer, default=1000)
     requests_made = db.Column(db.Integer, default=0)
     
+    # Key authentication only considers active keys; the partial index stays small
+    # and carries the columns the check needs
+    __table_args__ = (
+        db.Index(
+            'idx_api_keys_active_key', api_key,
+            postgresql_where=is_active,
+            postgresql_include=['key_id', 'user_id', 'expires_at', 'request_limit']
+        ),
+    )
+    
     # Relationships
     usage_logs = db.relationship('UsageLog', backref='api_key', lazy=True)
     
@@ -140,16 +198,67 @@ class UsageLog(db.Model):
     """Usage log model for tracking API usage"""
     __tablename__ = 'usage_logs'
     
-    log_id = db.Column(db.Integer, primary_key=True)
+    # Partitioned tables need the partition key in the primary key
+    log_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='SET NULL'))
     api_key_id = db.Column(db.Integer, db.ForeignKey('api_keys.key_id', ondelete='SET NULL'))
     request_type = db.Column(db.String(50), nullable=False)
     request_path = db.Column(db.String(255), nullable=False)
-    request_date = db.Column(db.DateTime, default=datetime.utcnow)
+    request_date = db.Column(db.DateTime(timezone=True), primary_key=True, server_default=func.now())
     response_code = db.Column(db.Integer, nullable=False)
-    processing_time = db.Column(db.Numeric(10, 3), nullable=False)  # in seconds
+    processing_time = db.Column(db.Float, nullable=False)  # in seconds
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.Text)
     
+    # Monthly range partitions keep recent indexes small and let old months be dropped;
+    # rate limiting counts a key's requests within a time window
+    __table_args__ = (
+        db.Index('idx_usage_logs_api_key_date', api_key_id, request_date),
+        {'postgresql_partition_by': 'RANGE (request_date)'}
+    )
+    
     def __repr__(self):
         return f'<UsageLog {self.log_id}>'
+
+# Rows outside every monthly partition land here instead of failing the insert
+event.listen(
+    UsageLog.__table__,
+    'after_create',
+    DDL("CREATE TABLE IF NOT EXISTS usage_logs_default PARTITION OF usage_logs DEFAULT").execute_if(dialect='postgresql')
+)
+
+
+# Characters that must be escaped in COPY's text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def bulk_insert_with_copy(table_name, columns, rows):
+    """
+    Insert many rows in one COPY ... FROM STDIN round trip
+    
+    Args:
+        table_name: Name of the table to insert into
+        columns: Column names, in the order of each row's values
+        rows: Sequence of row tuples; None is written as NULL
+        
+    Returns:
+        int: Number of rows written
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join('\\N' if value is None else str(value).translate(_COPY_ESCAPES) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    # COPY runs on a pooled DBAPI connection, outside the ORM session
+    raw_connection = db.engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            cursor.copy_from(buffer, table_name, columns=columns)
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+    
+    return len(rows)
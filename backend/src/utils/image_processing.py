@@ -3,143 +3,417 @@ SkyGate Application - Image Processing Utilities
 This module provides utility functions for image processing and feature extraction.
 """
 
+import io
 import os
+from collections import namedtuple
+from functools import lru_cache
 import cv2
 import numpy as np
 from PIL import Image
 import logging
+from .logging_utils import configure_logging
 from scipy import ndimage
-from skimage import feature
 import tempfile
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJSAMP_420, TJFLAG_FASTDCT
+except ImportError:
+    TurboJPEG = None
+
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-def extract_ela_features(image_path, quality=90):
+# libjpeg-turbo handle shared by all JPEG round-trips; None falls back to OpenCV
+_turbojpeg = None
+if TurboJPEG is not None:
+    try:
+        _turbojpeg = TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        # The Python binding is installed but the shared library could not be loaded
+        logger.warning("TurboJPEG unavailable, using OpenCV for JPEG round-trips: %s", e)
+
+def jpeg_round_trip(image, quality):
     """
-    Extract Error Level Analysis (ELA) features from an image
+    Compress an image as JPEG and decode it again, entirely in memory
     
     Args:
-        image_path: Path to the image file
+        image: Decoded image (BGR, uint8)
         quality: JPEG compression quality (0-100)
         
     Returns:
-        tuple: (ELA features array, path to ELA visualization image)
+        numpy.ndarray: Decompressed image (BGR, uint8)
     """
-    try:
-        # Create temporary directory for ELA processing
-        temp_dir = tempfile.mkdtemp()
-        temp_jpg = os.path.join(temp_dir, 'temp.jpg')
-        ela_path = os.path.join(temp_dir, 'ela.png')
+    # Prefer libjpeg-turbo's SIMD encoder/decoder when it is installed; 4:2:0
+    # chroma subsampling matches OpenCV so ELA scores do not depend on the backend
+    if _turbojpeg is not None:
+        buffer = _turbojpeg.encode(image, quality=quality, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+        return _turbojpeg.decode(buffer, pixel_format=TJPF_BGR)
+    
+    encoded, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not encoded:
+        raise ValueError("Could not re-encode image as JPEG")
+    
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+def decode_image(image_path):
+    """
+    Decode an image file into a BGR array
+    
+    Args:
+        image_path: Path to the image file
         
-        # Open the original image
-        original = Image.open(image_path).convert('RGB')
+    Returns:
+        numpy.ndarray: Decoded image (BGR, uint8)
+    """
+    # Decode straight from the page cache instead of copying the file into memory first
+    data = np.memmap(image_path, dtype=np.uint8, mode='r')
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    del data
+    
+    if image is None:
+        raise ValueError(f"Could not load image: {image_path}")
+    
+    return image
+
+# A decoded image with the grayscale plane the pixel analyses share
+DecodedImage = namedtuple('DecodedImage', ['bgr', 'gray'])
+
+@lru_cache(maxsize=4)
+def _load_image_cached(image_path, mtime_ns):
+    """Decode an image and its grayscale plane; mtime_ns invalidates entries for rewritten files"""
+    bgr = decode_image(image_path)
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    
+    # Cached arrays are shared between callers and must not be modified in place
+    bgr.flags.writeable = False
+    gray.flags.writeable = False
+    return DecodedImage(bgr, gray)
+
+def load_image(image_path):
+    """
+    Decode an image once for all analyses
+    
+    Args:
+        image_path: Path to the image file
         
-        # Save as temporary JPEG with specified quality
-        original.save(temp_jpg, 'JPEG', quality=quality)
+    Returns:
+        DecodedImage: Read-only BGR and grayscale arrays (uint8)
+    """
+    return _load_image_cached(image_path, os.stat(image_path).st_mtime_ns)
+
+def _as_bgr(image):
+    """Return a decoded BGR array for a DecodedImage, an array or a path"""
+    if isinstance(image, DecodedImage):
+        return image.bgr
+    if isinstance(image, np.ndarray):
+        return image
+    
+    return load_image(image).bgr
+
+def _as_gray(image):
+    """Return a grayscale array for a DecodedImage, a BGR array or a path"""
+    if isinstance(image, DecodedImage):
+        return image.gray
+    if isinstance(image, np.ndarray):
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    return load_image(image).gray
+
+# Side of the square tiles the ELA statistics are computed over; a 256x256x3
+# uint8 tile and its scratch copy fit in L2 cache
+ELA_TILE_SIZE = 256
+
+def _ela_image(original, compressed, dst=None):
+    """Return the scaled ELA difference |original - compressed| * 10, saturated to uint8"""
+    # convertScaleAbs saturates in place, so no wider temporaries are allocated
+    ela_image = cv2.absdiff(original, compressed, dst=dst)
+    return cv2.convertScaleAbs(ela_image, dst=ela_image, alpha=10)
+
+def _ela_statistics_tiled(original, compressed):
+    """
+    Compute per-channel mean and std of the ELA image tile by tile
+    
+    Each tile goes through difference, scaling and statistics while it is still in
+    cache, and the full-size ELA image is never allocated.
+    
+    Args:
+        original: Original image (BGR, uint8)
+        compressed: The same image after a JPEG round-trip
         
-        # Open the temporary JPEG
-        compressed = Image.open(temp_jpg).convert('RGB')
+    Returns:
+        tuple: (mean, std) arrays shaped like cv2.meanStdDev output
+    """
+    height, width, channels = original.shape
+    scratch = np.empty((ELA_TILE_SIZE, ELA_TILE_SIZE, channels), dtype=np.uint8)
+    sums = np.zeros(channels)
+    squares = np.zeros(channels)
+    
+    for y in range(0, height, ELA_TILE_SIZE):
+        for x in range(0, width, ELA_TILE_SIZE):
+            tile_height = min(ELA_TILE_SIZE, height - y)
+            tile_width = min(ELA_TILE_SIZE, width - x)
+            window = np.s_[y:y + tile_height, x:x + tile_width]
+            tile = _ela_image(original[window], compressed[window], dst=scratch[:tile_height, :tile_width])
+            
+            # Fold the tile into running sums of values and squares
+            tile_mean, tile_std = cv2.meanStdDev(tile)
+            count = tile_height * tile_width
+            sums += tile_mean[:, 0] * count
+            squares += (tile_std[:, 0] ** 2 + tile_mean[:, 0] ** 2) * count
+    
+    count = height * width
+    mean = sums / count
+    std = np.sqrt(np.maximum(squares / count - mean ** 2, 0.0))
+    return mean[:, None], std[:, None]
+
+def extract_ela_features(image, quality=90, save_visualization=False):
+    """
+    Extract Error Level Analysis (ELA) features from an image
+    
+    Args:
+        image: DecodedImage, BGR array (uint8) or path to the image file
+        quality: JPEG compression quality (0-100)
+        save_visualization: Whether to write the ELA image to a temporary file
         
-        # Calculate the difference
-        ela_image = np.array(original) - np.array(compressed)
+    Returns:
+        tuple: (ELA features array, path to ELA visualization image or None)
+    """
+    try:
+        original = _as_bgr(image)
         
-        # Scale the difference for better visualization
-        ela_image = np.absolute(ela_image) * 10
-        ela_image = np.clip(ela_image, 0, 255).astype(np.uint8)
+        # Re-compress as JPEG with the specified quality entirely in memory
+        compressed = jpeg_round_trip(original, quality)
         
-        # Save ELA visualization
-        Image.fromarray(ela_image).save(ela_path)
+        # Save ELA visualization only when requested; it needs the full ELA image
+        ela_path = None
+        if save_visualization:
+            ela_image = _ela_image(original, compressed)
+            ela_path = os.path.join(tempfile.mkdtemp(), 'ela.png')
+            cv2.imwrite(ela_path, ela_image)
+            mean, std = cv2.meanStdDev(ela_image)
+        else:
+            mean, std = _ela_statistics_tiled(original, compressed)
         
         # Extract features from ELA image
-        # For simplicity, we'll use mean and std of each channel as features
-        features = []
-        for channel in range(3):
-            channel_data = ela_image[:, :, channel].flatten()
-            features.append(np.mean(channel_data))
-            features.append(np.std(channel_data))
+        # For simplicity, we'll use mean and std of each channel as features,
+        # in RGB order
+        features = np.column_stack((mean[::-1, 0], std[::-1, 0])).ravel()
         
-        return np.array(features), ela_path
+        return features, ela_path
         
     except Exception as e:
-        logger.error(f"Error in ELA feature extraction: {str(e)}")
+        logger.error("Error in ELA feature extraction: %s", e)
         return np.zeros(6), None
 
-def extract_prnu_features(image_path):
+@lru_cache(maxsize=None)
+def cuda_enabled():
+    """Return True if OpenCV was built with CUDA and a device is visible to this process"""
+    return hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
+def _upload(array):
+    """Copy a host array to a new GpuMat"""
+    gpu_array = cv2.cuda_GpuMat()
+    gpu_array.upload(array)
+    return gpu_array
+
+def _denoise_nlm(gray):
+    """Non-local means denoising, on the GPU when OpenCV was built with CUDA"""
+    if cuda_enabled():
+        return cv2.cuda.fastNlMeansDenoising(_upload(gray), 10, search_window=21, block_size=7).download()
+    
+    return cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+
+def _denoise_gaussian(gray):
+    """Gaussian denoising (sigma 1.5), on the GPU when OpenCV was built with CUDA"""
+    if cuda_enabled():
+        # 11x11 is the kernel GaussianBlur derives from sigma 1.5 for uint8 input
+        gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (11, 11), 1.5)
+        return gaussian.apply(_upload(gray)).download()
+    
+    return cv2.GaussianBlur(gray, (0, 0), 1.5)
+
+# Quantiles reported by extract_prnu_features: 25th percentile, median, 75th percentile
+PRNU_QUANTILES = np.array([0.25, 0.5, 0.75])
+
+def _order_statistics(values, quantiles):
+    """
+    Compute the extremes and linearly interpolated quantiles of an array with one selection
+    
+    Args:
+        values: Numeric array of any shape
+        quantiles: Quantiles to compute, each in [0, 1]
+        
+    Returns:
+        tuple: ((min, max), quantile values), matching np.min/np.max/np.percentile
+    """
+    flat = values.ravel()
+    last = flat.size - 1
+    
+    # np.percentile interpolates between the two ranks around each position
+    positions = last * quantiles
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    
+    # A single quickselect places every needed rank, including the extremes
+    kth = np.unique(np.concatenate(([0, last], lower, upper)))
+    ordered = np.partition(flat, kth)
+    
+    values_at = ordered[lower] + (ordered[upper] - ordered[lower]) * (positions - lower)
+    return (ordered[0], ordered[last]), values_at
+
+def extract_prnu_features(image, denoiser='gaussian'):
     """
     Extract Photo Response Non-Uniformity (PRNU) features from an image
     
     Args:
-        image_path: Path to the image file
+        image: DecodedImage, BGR array (uint8) or path to the image file
+        denoiser: 'gaussian' for a fast separable blur, or 'nlm' for non-local means
         
     Returns:
         numpy.ndarray: PRNU features array
     """
     try:
-        # Load image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
-        
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _as_gray(image)
         
-        # Apply wavelet denoising to extract noise residual
+        # Denoise to extract the noise residual
         # This is a simplified approach; a real implementation would use more sophisticated methods
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        if denoiser == 'nlm':
+            denoised = _denoise_nlm(gray)
+        else:
+            denoised = _denoise_gaussian(gray)
         noise_residual = gray.astype(np.float32) - denoised.astype(np.float32)
         
         # Extract features from noise residual
         # For simplicity, we'll use statistical measures as features
-        features = [
-            np.mean(noise_residual),
-            np.std(noise_residual),
-            np.median(noise_residual),
-            np.max(noise_residual),
-            np.min(noise_residual),
-            np.percentile(noise_residual, 25),
-            np.percentile(noise_residual, 75)
-        ]
+        mean, std = cv2.meanStdDev(noise_residual)
+        (minimum, maximum), (q25, median, q75) = _order_statistics(noise_residual, PRNU_QUANTILES)
+        features = [mean[0, 0], std[0, 0], median, maximum, minimum, q25, q75]
         
         return np.array(features)
         
     except Exception as e:
-        logger.error(f"Error in PRNU feature extraction: {str(e)}")
+        logger.error("Error in PRNU feature extraction: %s", e)
         return np.zeros(7)
 
-def analyze_texture_smoothness(image_path):
+# Circular 8-neighbourhood offsets (dy, dx) used for local binary patterns
+LBP_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1))
+
+def _uniform_lbp_lut(points):
+    """Map every LBP code to its rotation-invariant uniform label (0..points+1)"""
+    lut = np.empty(1 << points, dtype=np.uint8)
+    for code in range(1 << points):
+        bits = [(code >> i) & 1 for i in range(points)]
+        transitions = sum(bits[i] != bits[(i + 1) % points] for i in range(points))
+        lut[code] = sum(bits) if transitions <= 2 else points + 1
+    return lut
+
+UNIFORM_LBP_LUT = _uniform_lbp_lut(len(LBP_OFFSETS))
+
+# At radius 1 the diagonal neighbours fall between pixels; like skimage, the offset is
+# rounded to five decimals and the neighbour is bilinearly interpolated
+LBP_DIAGONAL_WEIGHT = round(float(np.sqrt(0.5)), 5)
+
+def uniform_lbp(gray):
+    """
+    Compute uniform local binary patterns (P=8, R=1) of a grayscale image
+    
+    Follows skimage.feature.local_binary_pattern(gray, 8, 1, 'uniform'): diagonal
+    neighbours are interpolated and pixels outside the image read as 0. Labels match
+    skimage exactly for images narrower than 512 px; from column 512 on, skimage's
+    float sample positions round differently and a small fraction of labels differ.
+    
+    Args:
+        gray: Grayscale image (uint8)
+        
+    Returns:
+        numpy.ndarray: Uniform LBP labels (uint8, 0-9), one per pixel
+    """
+    height, width = gray.shape
+    padded = cv2.copyMakeBorder(gray, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+    padded_float = padded.astype(np.float64)
+    center_float = padded_float[1:-1, 1:-1]
+    codes = np.zeros(gray.shape, dtype=np.uint8)
+    
+    near = 1 - LBP_DIAGONAL_WEIGHT
+    far = LBP_DIAGONAL_WEIGHT
+    
+    # Build each pixel's 8-bit code from shifted views, one bit per neighbour
+    for bit, (dy, dx) in enumerate(LBP_OFFSETS):
+        if dy and dx:
+            # Blend along the row, then between the centre row and the neighbour row
+            center_row = near * center_float + far * padded_float[1:-1, 1 + dx:width + 1 + dx]
+            neighbour_row = (
+                near * padded_float[1 + dy:height + 1 + dy, 1:-1]
+                + far * padded_float[1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx]
+            )
+            above = (near * center_row + far * neighbour_row) >= center_float
+        else:
+            # Horizontal and vertical neighbours sit exactly on a pixel
+            above = padded[1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx] >= gray
+        codes |= above.view(np.uint8) << bit
+    
+    return UNIFORM_LBP_LUT[codes]
+
+def _edge_density_and_gradient(gray):
+    """
+    Measure Canny edge density and mean Sobel gradient magnitude of a grayscale image
+    
+    With CUDA the image is uploaded once and only the two reductions come back.
+    
+    Args:
+        gray: Grayscale image (uint8)
+        
+    Returns:
+        tuple: (edge density, mean gradient magnitude)
+    """
+    pixels = gray.shape[0] * gray.shape[1]
+    
+    if cuda_enabled():
+        gpu_gray = _upload(gray)
+        edges = cv2.cuda.createCannyEdgeDetector(100, 200).detect(gpu_gray)
+        sobelx = cv2.cuda.createSobelFilter(cv2.CV_8UC1, cv2.CV_32FC1, 1, 0, ksize=3).apply(gpu_gray)
+        sobely = cv2.cuda.createSobelFilter(cv2.CV_8UC1, cv2.CV_32FC1, 0, 1, ksize=3).apply(gpu_gray)
+        gradient_magnitude = cv2.cuda.magnitude(sobelx, sobely)
+        return cv2.cuda.countNonZero(edges) / pixels, cv2.cuda.sum(gradient_magnitude)[0] / pixels
+    
+    # 3x3 Sobel derivatives of uint8 input fit in int16; computing them once in
+    # CV_16S serves both Canny and the gradient magnitude. Canny's own Sobel
+    # replicates the border, so these must too for its edges to stay the same
+    sobelx = cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    sobely = cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    
+    # Calculate edge density using Canny edge detector on the same derivatives
+    edges = cv2.Canny(sobelx, sobely, 100, 200)
+    edge_density = cv2.countNonZero(edges) / pixels
+    
+    # Calculate gradient magnitude in single precision with OpenCV's SIMD kernels
+    gradient_magnitude = cv2.magnitude(sobelx.astype(np.float32), sobely.astype(np.float32))
+    return edge_density, cv2.mean(gradient_magnitude)[0]
+
+def analyze_texture_smoothness(image):
     """
     Analyze texture smoothness of an image
     
     Args:
-        image_path: Path to the image file
+        image: DecodedImage, BGR array (uint8) or path to the image file
         
     Returns:
         float: Smoothness score (0-1, higher means smoother)
     """
     try:
-        # Load image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
-        
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _as_gray(image)
         
-        # Calculate edge density using Canny edge detector
-        edges = cv2.Canny(gray, 100, 200)
-        edge_density = np.sum(edges > 0) / (edges.shape[0] * edges.shape[1])
+        # Calculate edge density and mean gradient magnitude
+        edge_density, gradient_mean = _edge_density_and_gradient(gray)
         
         # Calculate local binary pattern (LBP) for texture analysis
-        lbp = feature.local_binary_pattern(gray, 8, 1, method='uniform')
-        lbp_hist, _ = np.histogram(lbp, bins=10, range=(0, 10), density=True)
-        
-        # Calculate gradient magnitude
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
-        gradient_mean = np.mean(gradient_magnitude)
+        # Labels are integers 0-9, so an integer bincount replaces the float histogram
+        lbp = uniform_lbp(gray)
+        lbp_counts = np.bincount(lbp.ravel(), minlength=10)
+        lbp_hist = lbp_counts / lbp_counts.sum()
         
         # Calculate smoothness score
         # Lower edge density, lower gradient mean, and more uniform LBP indicate smoother textures
@@ -153,24 +427,22 @@ def analyze_texture_smoothness(image_path):
         return min(max(smoothness_score, 0), 1)  # Ensure score is between 0 and 1
         
     except Exception as e:
-        logger.error(f"Error in texture smoothness analysis: {str(e)}")
+        logger.error("Error in texture smoothness analysis: %s", e)
         return 0.5  # Return neutral score on error
 
-def detect_visual_anomalies(image_path):
+def detect_visual_anomalies(image):
     """
     Detect visual anomalies in an image that are typical of AI-generated content
     
     Args:
-        image_path: Path to the image file
+        image: DecodedImage, BGR array (uint8) or path to the image file
         
     Returns:
         dict: Dictionary containing detected anomalies
     """
     try:
         # Load image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
+        image = _as_bgr(image)
         
         # Initialize results
         anomalies = []
@@ -188,46 +460,86 @@ def detect_visual_anomalies(image_path):
         }
         
     except Exception as e:
-        logger.error(f"Error in visual anomaly detection: {str(e)}")
+        logger.error("Error in visual anomaly detection: %s", e)
         return {
             'detected_anomalies': [],
             'heatmap_path': None
         }
 
-def preprocess_image_for_model(image_path, target_size=(224, 224)):
+# ImageNet mean/std folded into one per-channel (RGB) multiply-add: (x / 255 - mean) / std
+MODEL_INPUT_MEAN = np.array([0.485, 0.456, 0.406])
+MODEL_INPUT_STD = np.array([0.229, 0.224, 0.225])
+MODEL_INPUT_SCALE = (1.0 / (255.0 * MODEL_INPUT_STD)).astype(np.float32)
+MODEL_INPUT_SHIFT = (-MODEL_INPUT_MEAN / MODEL_INPUT_STD).astype(np.float32)
+
+# Scaled IDCT factors libjpeg can decode at directly, smallest first
+JPEG_SCALING_FACTORS = ((1, 8), (1, 4), (1, 2))
+
+def _decode_reduced(image_path, target_size):
     """
-    Preprocess an image for input to deep learning models
+    Decode an image to RGB at the smallest JPEG DCT scale that still covers target_size
     
     Args:
         image_path: Path to the image file
+        target_size: (width, height) the image will be resized to
+        
+    Returns:
+        numpy.ndarray: Decoded image (RGB, uint8)
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    
+    # libjpeg-turbo skips most of the IDCT work for a scaled decode
+    if _turbojpeg is not None and data[:2] == b'\xff\xd8':
+        width, height, _, _ = _turbojpeg.decode_header(data)
+        scaling_factor = next(
+            (
+                (num, denom) for num, denom in JPEG_SCALING_FACTORS
+                if -(-width * num // denom) >= target_size[0] and -(-height * num // denom) >= target_size[1]
+            ),
+            None
+        )
+        return _turbojpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=scaling_factor, flags=TJFLAG_FASTDCT)
+    
+    # Pillow's draft mode selects the same DCT scaling; it is a no-op for other formats
+    with Image.open(io.BytesIO(data)) as pil_image:
+        pil_image.draft('RGB', target_size)
+        return np.asarray(pil_image.convert('RGB'))
+
+def preprocess_image_for_model(image, target_size=(224, 224), channels_first=False):
+    """
+    Preprocess an image for input to deep learning models
+    
+    Args:
+        image: DecodedImage, BGR array (uint8) or path to the image file
         target_size: Target size for resizing
+        channels_first: Whether to return NCHW instead of NHWC
         
     Returns:
-        numpy.ndarray: Preprocessed image array
+        numpy.ndarray: Preprocessed image array (float32)
     """
+    width, height = target_size
+    shape = (1, 3, height, width) if channels_first else (1, height, width, 3)
+    
     try:
-        # Load image
-        image = Image.open(image_path).convert('RGB')
+        # Load image; a path is decoded at reduced resolution since only target_size is kept
+        if isinstance(image, (str, os.PathLike)):
+            image_array = _decode_reduced(image, target_size)
+        else:
+            image_array = cv2.cvtColor(_as_bgr(image), cv2.COLOR_BGR2RGB)
         
         # Resize
-        image = image.resize(target_size, Image.LANCZOS)
-        
-        # Convert to numpy array
-        image_array = np.array(image)
-        
-        # Normalize
-        image_array = image_array.astype(np.float32) / 255.0
-        
-        # Standardize
-        mean = np.array([0.485, 0.456, 0.406])
-        std = np.array([0.229, 0.224, 0.225])
-        image_array = (image_array - mean) / std
+        image_array = cv2.resize(image_array, target_size, interpolation=cv2.INTER_AREA)
         
-        # Add batch dimension
-        image_array = np.expand_dims(image_array, axis=0)
+        # Normalize and standardize in one multiply-add written straight into the
+        # output layout, so only the result buffer is allocated
+        output = np.empty(shape, dtype=np.float32)
+        target = output[0].transpose(1, 2, 0) if channels_first else output[0]
+        np.multiply(image_array, MODEL_INPUT_SCALE, out=target)
+        np.add(target, MODEL_INPUT_SHIFT, out=target)
         
-        return image_array
+        return output
         
     except Exception as e:
-        logger.error(f"Error in image preprocessing: {str(e)}")
-        return np.zeros((1, target_size[0], target_size[1], 3))
+        logger.error("Error in image preprocessing: %s", e)
+        return np.zeros(shape, dtype=np.float32)
@@ -0,0 +1,68 @@
+"""
+SkyGate Application - Logging Utilities
+This module configures non-blocking logging shared by all SkyGate modules.
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Handler installed on the root logger; only enqueues records
+_queue_handler = None
+
+# Handler that performs the actual (blocking) stream writes
+_stream_handler = None
+
+# Background listener that drains the queue into the stream handler
+_listener = None
+
+def _start_listener():
+    """Start a listener thread on a fresh queue"""
+    global _listener
+    log_queue = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    
+    _listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener():
+    """Flush queued records on interpreter shutdown"""
+    if _listener is not None:
+        _listener.stop()
+
+def configure_logging(level=logging.INFO):
+    """
+    Route root logging through a queue drained by a background thread
+    
+    Log calls only enqueue the record, so request and task threads never
+    block on the stderr lock. Safe to call from every module; only the first
+    call installs the handlers.
+    
+    Args:
+        level: Root logging level
+        
+    Returns:
+        QueueListener: The running listener
+    """
+    global _queue_handler, _stream_handler
+    if _listener is not None:
+        return _listener
+    
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    
+    _queue_handler = QueueHandler(queue.Queue(-1))
+    
+    root_logger = logging.getLogger()
+    root_logger.addHandler(_queue_handler)
+    root_logger.setLevel(level)
+    
+    _start_listener()
+    atexit.register(_stop_listener)
+    
+    # Threads do not survive fork, so preforked gunicorn/Celery workers need their own listener
+    os.register_at_fork(after_in_child=_start_listener)
+    
+    return _listener
@@ -4,24 +4,103 @@ This module provides utility functions for analyzing image metadata.
 """
 
 import logging
+from .logging_utils import configure_logging
 import re
 from datetime import datetime
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Software names that indicate an AI image generator, compiled once as a single alternation
+AI_SOFTWARE_PATTERN = re.compile(
+    r'stable\s*diffusion|dall\s*[- ]?e|midjourney|generative|gan|neural|deep\s*dream|ai\s*image|openai',
+    re.IGNORECASE
+)
+
+# Date tags compared by the consistency checks
+DATE_FIELDS = ('EXIF DateTimeOriginal', 'EXIF DateTimeDigitized', 'Image DateTime')
+
+# One bit per tag the analyses test for presence
+EXIF_MAKE = 1 << 0
+EXIF_MODEL = 1 << 1
+EXIF_LENS_MODEL = 1 << 2
+EXIF_LENS_INFO = 1 << 3
+EXIF_EXPOSURE_TIME = 1 << 4
+EXIF_F_NUMBER = 1 << 5
+EXIF_ISO = 1 << 6
+EXIF_DATE_ORIGINAL = 1 << 7
+EXIF_DATE_DIGITIZED = 1 << 8
+EXIF_DATE_TIME = 1 << 9
+EXIF_GPS = 1 << 10  # Any 'GPS ' tag
+
+EXIF_TAG_BITS = {
+    'Image Make': EXIF_MAKE,
+    'Image Model': EXIF_MODEL,
+    'EXIF LensModel': EXIF_LENS_MODEL,
+    'EXIF LensInfo': EXIF_LENS_INFO,
+    'EXIF ExposureTime': EXIF_EXPOSURE_TIME,
+    'EXIF FNumber': EXIF_F_NUMBER,
+    'EXIF ISOSpeedRatings': EXIF_ISO,
+    'EXIF DateTimeOriginal': EXIF_DATE_ORIGINAL,
+    'EXIF DateTimeDigitized': EXIF_DATE_DIGITIZED,
+    'Image DateTime': EXIF_DATE_TIME
+}
+
+EXIF_CAMERA = EXIF_MAKE | EXIF_MODEL
+EXIF_LENS = EXIF_LENS_MODEL | EXIF_LENS_INFO
+EXIF_EXPOSURE = EXIF_EXPOSURE_TIME | EXIF_F_NUMBER | EXIF_ISO
+EXIF_DATES = EXIF_DATE_ORIGINAL | EXIF_DATE_DIGITIZED | EXIF_DATE_TIME
+
+class ExifTags(dict):
+    """EXIF tags with string keys and values, and a bitmask of the tags present"""
+    
+    __slots__ = ('mask',)
+    
+    def __init__(self, exif_tags):
+        super().__init__((str(key), str(value)) for key, value in exif_tags.items())
+        
+        # Presence checks become bit tests against a mask built in one pass over the keys
+        mask = 0
+        for key in self:
+            mask |= EXIF_TAG_BITS.get(key, 0)
+            if key.startswith('GPS '):
+                mask |= EXIF_GPS
+        self.mask = mask
+    
+    @property
+    def has_gps(self):
+        """Whether any GPS tag is present"""
+        return bool(self.mask & EXIF_GPS)
+
+def normalize_exif_tags(exif_tags):
+    """
+    Convert EXIF tags to strings once so every analysis can share them
+    
+    Args:
+        exif_tags: Dictionary of EXIF tags extracted from an image, or None
+        
+    Returns:
+        ExifTags: Normalized tags; already-normalized tags are returned unchanged
+    """
+    if isinstance(exif_tags, ExifTags):
+        return exif_tags
+    
+    return ExifTags(exif_tags or {})
+
 def analyze_exif_metadata(exif_tags):
     """
     Analyze EXIF metadata for signs of AI generation
     
     Args:
-        exif_tags: Dictionary of EXIF tags extracted from an image
+        exif_tags: Dictionary of EXIF tags extracted from an image, or ExifTags
         
     Returns:
         dict: Analysis results
     """
     try:
+        exif_tags = normalize_exif_tags(exif_tags)
+        
         # Initialize results
         results = {
             'is_suspicious': False,
@@ -36,53 +115,37 @@ def analyze_exif_metadata(exif_tags):
             results['anomalies'].append('No EXIF metadata found')
             return results
         
+        # Presence checks test bits of the mask built during normalization
+        mask = exif_tags.mask
+        
         # Check for camera make and model
-        if 'Image Make' not in exif_tags and 'Image Model' not in exif_tags:
+        if not mask & EXIF_CAMERA:
             results['anomalies'].append('No camera make or model information')
         
         # Check for lens information
-        if 'EXIF LensModel' not in exif_tags and 'EXIF LensInfo' not in exif_tags:
+        if not mask & EXIF_LENS:
             results['anomalies'].append('No lens information')
         
         # Check for exposure settings
-        if ('EXIF ExposureTime' not in exif_tags or 
-            'EXIF FNumber' not in exif_tags or 
-            'EXIF ISOSpeedRatings' not in exif_tags):
+        if (mask & EXIF_EXPOSURE) != EXIF_EXPOSURE:
             results['anomalies'].append('Incomplete exposure settings')
         
         # Check for software information
-        if 'Image Software' in exif_tags:
-            software = str(exif_tags['Image Software'])
-            ai_software_patterns = [
-                r'(?i)stable\s*diffusion',
-                r'(?i)dall\s*[- ]?e',
-                r'(?i)midjourney',
-                r'(?i)generative',
-                r'(?i)gan',
-                r'(?i)neural',
-                r'(?i)deep\s*dream',
-                r'(?i)ai\s*image',
-                r'(?i)openai'
-            ]
-            
-            for pattern in ai_software_patterns:
-                if re.search(pattern, software):
-                    results['anomalies'].append(f'AI software detected: {software}')
-                    results['is_suspicious'] = True
-                    results['confidence'] = 0.95
-                    return results
+        software = exif_tags.get('Image Software')
+        if software is not None and AI_SOFTWARE_PATTERN.search(software):
+            results['anomalies'].append(f'AI software detected: {software}')
+            results['is_suspicious'] = True
+            results['confidence'] = 0.95
+            return results
         
         # Check for creation date consistency
-        if 'EXIF DateTimeOriginal' in exif_tags and 'EXIF DateTimeDigitized' in exif_tags:
-            original_date = str(exif_tags['EXIF DateTimeOriginal'])
-            digitized_date = str(exif_tags['EXIF DateTimeDigitized'])
-            
-            if original_date != digitized_date:
-                results['anomalies'].append('Inconsistent creation dates')
+        original_date = exif_tags.get('EXIF DateTimeOriginal')
+        digitized_date = exif_tags.get('EXIF DateTimeDigitized')
+        if original_date is not None and digitized_date is not None and original_date != digitized_date:
+            results['anomalies'].append('Inconsistent creation dates')
         
         # Check for GPS information
-        has_gps = any(key.startswith('GPS ') for key in exif_tags)
-        if not has_gps:
+        if not mask & EXIF_GPS:
             results['anomalies'].append('No GPS information')
         
         # Calculate suspicion level based on anomalies
@@ -101,7 +164,7 @@ def analyze_exif_metadata(exif_tags):
         return results
         
     except Exception as e:
-        logger.error(f"Error in EXIF metadata analysis: {str(e)}")
+        logger.error("Error in EXIF metadata analysis: %s", e)
         return {
             'is_suspicious': False,
             'confidence': 0.0,
@@ -113,12 +176,14 @@ def extract_metadata_features(exif_tags):
     Extract features from EXIF metadata for machine learning models
     
     Args:
-        exif_tags: Dictionary of EXIF tags extracted from an image
+        exif_tags: Dictionary of EXIF tags extracted from an image, or ExifTags
         
     Returns:
         dict: Extracted features
     """
     try:
+        exif_tags = normalize_exif_tags(exif_tags)
+        
         # Initialize features
         features = {
             'has_exif': len(exif_tags) > 0,
@@ -134,39 +199,30 @@ def extract_metadata_features(exif_tags):
         }
         
         # Extract camera information
-        if 'Image Make' in exif_tags:
-            features['has_camera_info'] = True
-            features['camera_make'] = str(exif_tags['Image Make'])
-        
-        if 'Image Model' in exif_tags:
-            features['has_camera_info'] = True
-            features['camera_model'] = str(exif_tags['Image Model'])
+        features['camera_make'] = exif_tags.get('Image Make')
+        features['camera_model'] = exif_tags.get('Image Model')
+        features['has_camera_info'] = features['camera_make'] is not None or features['camera_model'] is not None
         
         # Extract lens information
-        features['has_lens_info'] = ('EXIF LensModel' in exif_tags or 'EXIF LensInfo' in exif_tags)
+        features['has_lens_info'] = bool(exif_tags.mask & EXIF_LENS)
         
         # Extract exposure information
-        features['has_exposure_info'] = ('EXIF ExposureTime' in exif_tags and 
-                                        'EXIF FNumber' in exif_tags and 
-                                        'EXIF ISOSpeedRatings' in exif_tags)
+        features['has_exposure_info'] = (exif_tags.mask & EXIF_EXPOSURE) == EXIF_EXPOSURE
         
         # Extract GPS information
-        features['has_gps'] = any(key.startswith('GPS ') for key in exif_tags)
+        features['has_gps'] = exif_tags.has_gps
         
         # Extract software information
-        if 'Image Software' in exif_tags:
-            features['has_software_info'] = True
-            features['software_name'] = str(exif_tags['Image Software'])
+        features['software_name'] = exif_tags.get('Image Software')
+        features['has_software_info'] = features['software_name'] is not None
         
         # Extract date information
-        features['has_date_info'] = ('EXIF DateTimeOriginal' in exif_tags or 
-                                    'EXIF DateTimeDigitized' in exif_tags or 
-                                    'Image DateTime' in exif_tags)
+        features['has_date_info'] = bool(exif_tags.mask & EXIF_DATES)
         
         return features
         
     except Exception as e:
-        logger.error(f"Error in metadata feature extraction: {str(e)}")
+        logger.error("Error in metadata feature extraction: %s", e)
         return {
             'has_exif': False,
             'error': str(e)
@@ -177,12 +233,14 @@ def check_metadata_consistency(exif_tags):
     Check for consistency in metadata values
     
     Args:
-        exif_tags: Dictionary of EXIF tags extracted from an image
+        exif_tags: Dictionary of EXIF tags extracted from an image, or ExifTags
         
     Returns:
         dict: Consistency check results
     """
     try:
+        exif_tags = normalize_exif_tags(exif_tags)
+        
         # Initialize results
         results = {
             'is_consistent': True,
@@ -190,16 +248,7 @@ def check_metadata_consistency(exif_tags):
         }
         
         # Check date consistency
-        date_fields = [
-            'EXIF DateTimeOriginal',
-            'EXIF DateTimeDigitized',
-            'Image DateTime'
-        ]
-        
-        dates = {}
-        for field in date_fields:
-            if field in exif_tags:
-                dates[field] = str(exif_tags[field])
+        dates = {field: exif_tags[field] for field in DATE_FIELDS if field in exif_tags}
         
         if len(dates) > 1:
             unique_dates = set(dates.values())
@@ -210,7 +259,7 @@ def check_metadata_consistency(exif_tags):
         # Check for impossible camera settings
         if 'EXIF FNumber' in exif_tags:
             try:
-                f_number = float(str(exif_tags['EXIF FNumber']).split('/')[0])
+                f_number = float(exif_tags['EXIF FNumber'].split('/')[0])
                 if f_number < 0.7 or f_number > 64:
                     results['is_consistent'] = False
                     results['inconsistencies'].append(f'Unrealistic F-number: {f_number}')
@@ -219,7 +268,7 @@ def check_metadata_consistency(exif_tags):
         
         if 'EXIF ISOSpeedRatings' in exif_tags:
             try:
-                iso = int(str(exif_tags['EXIF ISOSpeedRatings']))
+                iso = int(exif_tags['EXIF ISOSpeedRatings'])
                 if iso < 50 or iso > 409600:
                     results['is_consistent'] = False
                     results['inconsistencies'].append(f'Unrealistic ISO: {iso}')
@@ -230,8 +279,8 @@ def check_metadata_consistency(exif_tags):
         if 'GPS GPSLatitude' in exif_tags and 'GPS GPSLongitude' in exif_tags:
             try:
                 # This is a simplified check; a real implementation would parse the coordinates properly
-                lat = str(exif_tags['GPS GPSLatitude'])
-                lon = str(exif_tags['GPS GPSLongitude'])
+                lat = exif_tags['GPS GPSLatitude']
+                lon = exif_tags['GPS GPSLongitude']
                 
                 if '[0, 0, 0]' in lat or '[0, 0, 0]' in lon:
                     results['is_consistent'] = False
@@ -242,7 +291,7 @@ def check_metadata_consistency(exif_tags):
         return results
         
     except Exception as e:
-        logger.error(f"Error in metadata consistency check: {str(e)}")
+        logger.error("Error in metadata consistency check: %s", e)
         return {
             'is_consistent': True,
             'error': str(e)
@@ -0,0 +1,70 @@
+"""
+SkyGate Application - Security Utilities
+This module provides password hashing helpers backed by Argon2.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from werkzeug.security import check_password_hash
+
+# Argon2id hasher; parameters are encoded in each hash so they can be raised later
+password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# Hashing runs in C and releases the GIL, so a shared pool lets the worker keep
+# serving other requests (threads or greenlets) while a hash is computed
+hash_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix='password-hash'
+)
+
+def _is_argon2_hash(password_hash):
+    """Check whether a stored hash was produced by Argon2"""
+    return password_hash.startswith('$argon2')
+
+def hash_password(password):
+    """
+    Hash a password with Argon2
+    
+    Args:
+        password: Plain-text password
+        
+    Returns:
+        str: Encoded hash including algorithm and parameters
+    """
+    return hash_executor.submit(password_hasher.hash, password).result()
+
+def verify_password(password_hash, password):
+    """
+    Verify a password against a stored hash
+    
+    Legacy Werkzeug PBKDF2 hashes are still accepted so existing accounts can
+    log in and be migrated with needs_rehash().
+    
+    Args:
+        password_hash: Stored password hash
+        password: Plain-text password to check
+        
+    Returns:
+        bool: True if the password matches
+    """
+    return hash_executor.submit(_verify_password, password_hash, password).result()
+
+def _verify_password(password_hash, password):
+    """Verify a password on the hashing pool"""
+    if not _is_argon2_hash(password_hash):
+        return check_password_hash(password_hash, password)
+    
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def needs_rehash(password_hash):
+    """Check whether a stored hash should be upgraded to the current Argon2 parameters"""
+    if not _is_argon2_hash(password_hash):
+        return True
+    
+    return password_hasher.check_needs_rehash(password_hash)
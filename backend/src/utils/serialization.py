@@ -0,0 +1,41 @@
+"""
+SkyGate Application - Serialization Utilities
+This module provides the orjson-backed JSON encoding used by Flask and Flask-RESTful.
+"""
+
+from decimal import Decimal
+
+import orjson
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+# Naive datetimes are stored in UTC; numpy arrays come from the analysis pipeline
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_bytes(obj):
+    """Serialize an object to JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that encodes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation that encodes resource responses with orjson"""
+    return current_app.response_class(
+        dumps_bytes(data),
+        status=code,
+        headers=headers,
+        mimetype='application/json'
+    )
@@ -20,6 +20,13 @@ import { CloudUpload as UploadIcon } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import { uploadAPI, detectionAPI } from '../utils/api';
 
+// Detection status polling
+const DETECTION_POLL_INTERVAL_MS = 2000;
+const DETECTION_POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+// Celery states of a task that has not finished yet; anything else except SUCCESS is a failure
+const DETECTION_PENDING_STATES = ['PENDING', 'RECEIVED', 'STARTED', 'RETRY'];
+
 const Upload: React.FC = () => {
   const [file, setFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
@@ -57,26 +64,37 @@ const Upload: React.FC = () => {
       setError(null);
       setUploadProgress(0);
 
-      // Create form data
-      const formData = new FormData();
-      formData.append('file', file);
-
       // Upload file with progress tracking
-      const uploadResponse = await uploadAPI.uploadFile(formData, (progressEvent) => {
+      const uploadResponse = await uploadAPI.uploadFile(file, (progressEvent) => {
         if (progressEvent.total) {
           const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
           setUploadProgress(progress);
         }
       });
 
-      // Process detection
-      const processResponse = await detectionAPI.processUpload(uploadResponse.data.upload_id);
-      
-      setResultId(processResponse.data.result_id);
+      // Wait for the queued detection to finish
+      const taskId = uploadResponse.data.task_id;
+      const deadline = Date.now() + DETECTION_POLL_TIMEOUT_MS;
+      let status = (await detectionAPI.getDetectionStatus(taskId)).data;
+      while (DETECTION_PENDING_STATES.includes(status.state)) {
+        // A lost task or an expired result stays PENDING forever
+        if (Date.now() >= deadline) {
+          throw new Error('Detection is taking too long. Please check your uploads later.');
+        }
+        await new Promise((resolve) => setTimeout(resolve, DETECTION_POLL_INTERVAL_MS));
+        status = (await detectionAPI.getDetectionStatus(taskId)).data;
+      }
+
+      // FAILURE, REVOKED and any other final state
+      if (status.state !== 'SUCCESS') {
+        throw new Error(status.error || 'Detection processing failed');
+      }
+
+      setResultId(status.result.result_id);
       setActiveStep(2);
     } catch (err: any) {
       console.error('Upload error:', err);
-      setError(err.response?.data?.error || 'Failed to upload and process file. Please try again.');
+      setError(err.response?.data?.error || err.message || 'Failed to upload and process file. Please try again.');
     } finally {
       setUploading(false);
     }
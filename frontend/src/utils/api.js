@@ -55,21 +55,24 @@ export const userAPI = {
 };
 
 export const uploadAPI = {
-  uploadFile: (formData, onUploadProgress) => 
-    api.post('/uploads', formData, {
+  uploadFile: (file, onUploadProgress) => 
+    api.post('/uploads', file, {
       headers: {
-        'Content-Type': 'multipart/form-data',
+        'Content-Type': 'application/octet-stream',
+        'X-Filename': encodeURIComponent(file.name),
+        'X-Content-Type': file.type,
       },
       onUploadProgress,
     }),
   getUploadById: (uploadId) => api.get(`/uploads/${uploadId}`),
-  getAllUploads: (page = 1, perPage = 10) => 
-    api.get('/uploads', { params: { page, per_page: perPage } }),
+  getAllUploads: (cursor = null, limit = 10) => 
+    api.get('/uploads', { params: { ...(cursor || {}), limit } }),
   deleteUpload: (uploadId) => api.delete(`/uploads/${uploadId}`),
 };
 
 export const detectionAPI = {
   processUpload: (uploadId) => api.post(`/detections/process/${uploadId}`),
+  getDetectionStatus: (taskId) => api.get(`/detections/status/${taskId}`),
   getDetectionById: (resultId) => api.get(`/detections/${resultId}`),
   getAllDetections: (page = 1, perPage = 10, filters = {}) => 
     api.get('/detections', { 